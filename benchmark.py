@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the control path and the MCP tools, run against the simulated arm (so101_sim).
+Writes a JSON report and compares it against a baseline recorded on the same machine, exits with 1 when a metric regressed.
+Worst-case metrics (p95, max lateness, skipped steps) are reported but never fail the comparison.
+
+    python benchmark.py --output report.json
+    python benchmark.py --runs 3 --save-baseline benchmark_baseline.json
+    python benchmark.py --runs 3 --baseline benchmark_baseline.json --tolerance 0.25
+"""
+
+import argparse
+import json
+import logging
+import platform
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from config_robot import robot_config
+from image_pipeline import CameraMosaic
+
+logger = logging.getLogger(__name__)
+
+# resolutions used for the JPEG encode benchmark (width, height)
+ENCODE_RESOLUTIONS = [(640, 480), (1280, 720), (1920, 1080)]
+
+# changes smaller than this never count as a regression, whatever the relative change (1 ms for timings)
+NOISE_FLOOR = {"ms": 1.0, "us": 1000.0, "ratio": 0.05, "steps": 1.0}
+
+
+#one measured value, better says which direction is an improvement
+#gate=False keeps a metric out of the baseline comparison, floor overrides NOISE_FLOOR for its unit
+def metric(value: float, unit: str, better: str = "lower", gate: bool = True, floor: Optional[float] = None) -> Dict[str, Any]:
+    floor = NOISE_FLOOR.get(unit, 0.0) if floor is None else floor
+    return {"value": round(float(value), 4), "unit": unit, "better": better, "gate": gate, "floor": floor}
+
+
+#time fn over repeat calls, returns the per-call durations in milliseconds
+#setup runs before every call (warmup included) and is not timed
+def time_calls(fn: Callable[[], Any], repeat: int, warmup: int = 1, setup: Optional[Callable[[], Any]] = None) -> np.ndarray:
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        fn()
+    durations = np.empty(repeat)
+    for i in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        durations[i] = (time.perf_counter() - start) * 1000.0
+    return durations
+
+
+#p50 / p95 latency metrics for a set of durations, only the p50 is compared against the baseline
+def latency_metrics(prefix: str, durations_ms: np.ndarray) -> Dict[str, Dict[str, Any]]:
+    return {
+        f"{prefix}.p50_ms": metric(np.percentile(durations_ms, 50), "ms"),
+        f"{prefix}.p95_ms": metric(np.percentile(durations_ms, 95), "ms", gate=False),
+    }
+
+
+def bench_conversion(robot: Any, repeat: int) -> Dict[str, Dict[str, Any]]:
+    converter = robot.converter
+    names = robot.names_of_joint
+    cols = converter.columns(names)
+    start = np.array([robot.presets["1"][name] for name in names], dtype=np.float64)
+    target = np.array([robot.presets["2"][name] for name in names], dtype=np.float64)
+    trajectory = start + (target - start) * np.linspace(0.0, 1.0, 150)[:, None]
+
+    results = {}
+    durations = time_calls(lambda: converter.convert_and_validate(trajectory, cols), repeat)
+    results["conversion.validate_150_steps_ms"] = metric(np.median(durations), "ms")
+    durations = time_calls(lambda: converter.to_actions(converter.deg_to_norm(trajectory, cols), cols), repeat)
+    results["conversion.actions_150_steps_ms"] = metric(np.median(durations), "ms")
+
+    pose = robot.presets["2"]
+    durations = time_calls(lambda: robot.check_if_valid_position(pose), repeat * 10)
+    results["conversion.check_position_us"] = metric(np.median(durations) * 1000.0, "us")
+
+    robot.apply_named_preset("1")
+    durations = time_calls(lambda: robot.plan_interpolated_trajectory(robot.presets["2"]), repeat)
+    results["planning.preset_move_ms"] = metric(np.median(durations), "ms")
+    return results
+
+
+def bench_motion(robot: Any, moves: int) -> Dict[str, Dict[str, Any]]:
+    rates: List[float] = []
+    jitters: List[float] = []
+    lateness: List[float] = []
+    skipped = 0
+    for i in range(moves):
+        result = robot.apply_named_preset("2" if i % 2 == 0 else "1")
+        if not result.ok:
+            raise RuntimeError(f"Benchmark move failed: {result.msg}")
+        timing = result.timing
+        rates.append(timing.get("achieved_rate_hz", 0.0))
+        jitters.append(timing.get("jitter_ms", 0.0))
+        lateness.append(timing["max_lateness_ms"])
+        skipped += timing["steps_skipped"]
+
+    nominal = 1.0 / robot.movement_constant["STEP_DELAY_SECONDS"]
+    return {
+        "motion.achieved_rate_ratio": metric(np.mean(rates) / nominal, "ratio", "higher"),
+        "motion.jitter_ms": metric(np.mean(jitters), "ms"),
+        "motion.max_lateness_ms": metric(np.max(lateness), "ms", gate=False),
+        "motion.steps_skipped": metric(skipped, "steps", gate=False),
+    }
+
+
+def bench_state(robot: Any, repeat: int) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    results.update(latency_metrics("state.read_joints", time_calls(robot.read_joint_positions_norm, repeat)))
+    results.update(latency_metrics("state.full_state", time_calls(robot.get_full_state, repeat)))
+
+    robot.start_state_observer()
+    try:
+        time.sleep(0.2)
+        max_staleness = robot_config.STATE_OBSERVER["MAX_STALENESS_S"]
+        results.update(latency_metrics("state.observer_snapshot",
+                                       time_calls(lambda: robot.get_state_snapshot(max_staleness), repeat)))
+    finally:
+        robot.stop_state_observer()
+    return results
+
+
+def bench_cameras(robot: Any, encode: Optional[Callable[[np.ndarray], Any]], repeat: int) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    robot.start_camera_capture()
+    results.update(latency_metrics("camera.get_images", time_calls(robot.get_camera_images, repeat)))
+
+    if encode is None:
+        return results
+    rng = np.random.default_rng(0)
+    for width, height in ENCODE_RESOLUTIONS:
+        # noise on a gradient, roughly as hard to compress as a camera frame
+        image = (np.linspace(0, 200, width, dtype=np.float32)[None, :, None] + rng.integers(0, 40, (height, width, 3))).astype(np.uint8)
+        durations = time_calls(lambda: encode(image), max(3, repeat // 4))
+        results[f"encode.{width}x{height}_ms"] = metric(np.median(durations), "ms")
+
+    # two full-HD views composed into one mosaic and encoded, compare with twice encode.1920x1080_ms
+    mosaic_cfg = robot_config.CAMERA_MOSAIC
+    mosaic = CameraMosaic(mosaic_cfg["MAX_WIDTH"], mosaic_cfg["MAX_HEIGHT"],
+                          {int(count): tuple(grid) for count, grid in mosaic_cfg["LAYOUTS"].items()})
+    views = {"wrist": image, "top": image}
+    durations = time_calls(lambda: encode(mosaic.compose(views, {})), max(3, repeat // 4))
+    results["encode.mosaic_2x1920x1080_ms"] = metric(np.median(durations), "ms")
+    return results
+
+
+#every call starts from preset 1 with the arm at rest, so a tool is not timed from wherever the previous one left the arm
+def bench_mcp_tools(server: Any, robot: Any, repeat: int) -> Dict[str, Dict[str, Any]]:
+    # every tool the server exposes, with arguments that keep the arm inside its workspace
+    calls = {
+        "get_initial_instructions": lambda: server.get_initial_instructions(),
+        "get_robot_state": lambda: server.get_robot_state(),
+        "move_robot": lambda: (server.move_robot(move_gripper_up_mm="5"), server.move_robot(move_gripper_up_mm="-5")),
+        "control_gripper": lambda: server.control_gripper("20"),
+        "dimm_protocol": lambda: server.dimm_protocol("3"),
+        "cpu_protocol": lambda: server.cpu_protocol("1"),
+        "inspection_tour": lambda: server.inspection_tour("dimm", "true"),
+        "run_motion_script": lambda: server.run_motion_script([{"move": {"move_gripper_up_mm": 5}, "checkpoint": True},
+                                                               {"move": {"move_gripper_up_mm": -5}}]),
+        "set_tracing": lambda: (server.set_tracing("true"), server.tracing.disable()),
+    }
+    def reset_pose() -> None:
+        result = robot.apply_named_preset("1")
+        if not result.ok:
+            raise RuntimeError(f"Benchmark reset failed: {result.msg}")
+        robot.wait_until_settled()
+
+    results = {}
+    for name, call in calls.items():
+        durations = time_calls(call, repeat, warmup=0, setup=reset_pose)
+        results[f"mcp.{name}_ms"] = metric(np.median(durations), "ms")
+    return results
+
+
+#one report from several runs, every metric is the median of its runs so a burst of load in one run does not count
+def merge_runs(reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+    merged = dict(reports[-1], settings=dict(reports[-1]["settings"], runs=len(reports)))
+    merged["metrics"] = {}
+    for name, last in reports[-1]["metrics"].items():
+        values = [report["metrics"][name]["value"] for report in reports if name in report["metrics"]]
+        merged["metrics"][name] = metric(np.median(values), last["unit"], last["better"], last["gate"], last["floor"])
+    return merged
+
+
+#worse-than-baseline metrics beyond tolerance (a fraction) and beyond their noise floor, {name: (baseline, current, change)}
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> Dict[str, Dict[str, float]]:
+    regressions = {}
+    for name, current in report["metrics"].items():
+        previous = baseline.get("metrics", {}).get(name)
+        if previous is None or not current.get("gate", True):
+            continue
+        diff = current["value"] - previous["value"]
+        if current["better"] == "higher":
+            diff = -diff
+        if diff <= current.get("floor", 0.0):
+            continue
+        # a zero baseline (e.g. no skipped steps) regresses on any increase
+        change = diff / abs(previous["value"]) if previous["value"] else (float("inf") if diff > 0 else 0.0)
+        if change > tolerance:
+            regressions[name] = {"baseline": previous["value"], "current": current["value"], "change": change}
+    return regressions
+
+
+def run(repeat: int, moves: int, tool_repeat: int) -> Dict[str, Any]:
+    # simulated arm only, the benchmark must never move real hardware
+    robot_config.lerobot_config["type"] = "so101_sim"
+    from controller_for_arm import RobotController
+
+    try:
+        import mcp_server
+    except ImportError as e:
+        logger.warning(f"MCP server not importable ({e}), skipping encode and tool benchmarks")
+        mcp_server = None
+
+    robot = RobotController()
+    metrics: Dict[str, Dict[str, Any]] = {}
+    skipped: List[str] = []
+    try:
+        metrics.update(bench_conversion(robot, repeat))
+        metrics.update(bench_motion(robot, moves))
+        metrics.update(bench_state(robot, repeat))
+        metrics.update(bench_cameras(robot, mcp_server._np_to_mcp_image if mcp_server else None, repeat))
+        if mcp_server is not None:
+            mcp_server._robot = robot
+            metrics.update(bench_mcp_tools(mcp_server, robot, tool_repeat))
+        else:
+            skipped += ["encode", "mcp"]
+    finally:
+        if mcp_server is not None:
+            mcp_server._robot = None
+        robot.disconnect(reset_pos=False)
+
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "host": {"python": platform.python_version(), "machine": platform.machine(), "system": platform.system()},
+        "settings": {"repeat": repeat, "moves": moves, "tool_repeat": tool_repeat},
+        "skipped": skipped,
+        "metrics": metrics,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the controller and MCP server against the simulated arm")
+    parser.add_argument("--output", default="benchmark_report.json", help="where to write the report")
+    parser.add_argument("--baseline", help="report to compare against, regressions make the exit code 1")
+    parser.add_argument("--save-baseline", help="also write the report here to use as the next baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative change before a metric counts as a regression")
+    parser.add_argument("--repeat", type=int, default=50, help="calls per micro benchmark")
+    parser.add_argument("--moves", type=int, default=4, help="preset moves for the motion benchmark")
+    parser.add_argument("--tool-repeat", type=int, default=3, help="calls per MCP tool")
+    parser.add_argument("--runs", type=int, default=1, help="repeat the whole benchmark and report the median of every metric")
+    args = parser.parse_args()
+
+    report = merge_runs([run(args.repeat, args.moves, args.tool_repeat) for _ in range(max(1, args.runs))])
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    width = max(len(name) for name in report["metrics"])
+    for name, value in report["metrics"].items():
+        print(f"{name:<{width}}  {value['value']:>12.4f} {value['unit']}{'' if value['gate'] else '  (not compared)'}")
+    print(f"Report written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}:")
+            for name, change in regressions.items():
+                print(f"  {name}: {change['baseline']} -> {change['current']} ({change['change']:.1%} worse)")
+            return 1
+        print(f"No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
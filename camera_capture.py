@@ -0,0 +1,102 @@
+"""
+One capture thread per camera, each keeping the latest frame and its capture time
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+#a captured frame, timestamp is time.monotonic() right after the camera returned it
+@dataclass(frozen=True)
+class CameraFrame:
+    image: np.ndarray
+    timestamp: float
+    index: int
+
+
+class CameraCapture:
+
+    #camera is any lerobot camera, read() blocks until the next frame is available
+    def __init__(self, name: str, camera: Any) -> None:
+        self.name = name
+        self.camera = camera
+        self._latest: Optional[CameraFrame] = None
+        self._new_frame = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name=f"camera-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._new_frame:
+            self._new_frame.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    #freshest frame without waiting, None before the first capture
+    @property
+    def latest(self) -> Optional[CameraFrame]:
+        return self._latest
+
+    #block until a frame captured after the given monotonic time arrives, falls back to the latest frame on timeout
+    def wait_for_newer(self, newer_than: float, timeout: Optional[float] = None) -> Optional[CameraFrame]:
+        with self._new_frame:
+            arrived = self._new_frame.wait_for(
+                lambda: self._stop.is_set() or (self._latest is not None and self._latest.timestamp > newer_than), timeout)
+            frame = self._latest
+        if not arrived or self._stop.is_set():
+            logger.warning(f"Camera '{self.name}' had no frame newer than the requested time, returning the latest one")
+        return frame
+
+    def _loop(self) -> None:
+        index = 0
+        failing = False
+        while not self._stop.is_set():
+            try:
+                image = self.camera.read()
+            except Exception as e:
+                # log once per failure streak, then back off so a dead camera does not spin
+                if not failing:
+                    logger.error(f"Camera '{self.name}' capture failed: {e}", exc_info=True)
+                failing = True
+                self._stop.wait(0.1)
+                continue
+
+            if failing:
+                logger.info(f"Camera '{self.name}' capture recovered")
+            failing = False
+
+            if not isinstance(image, np.ndarray) or image.ndim != 3:
+                continue
+            index += 1
+            with self._new_frame:
+                self._latest = CameraFrame(image, time.monotonic(), index)
+                self._new_frame.notify_all()
+
+
+#start one capture per camera {name: camera}
+def start_captures(cameras: Dict[str, Any]) -> Dict[str, CameraCapture]:
+    captures = {}
+    for name, camera in cameras.items():
+        capture = CameraCapture(name, camera)
+        capture.start()
+        captures[name] = capture
+    return captures
@@ -8,7 +8,7 @@ from typing import Dict, Tuple,Any, Final
 from lerobot.cameras.opencv.configuration_opencv import OpenCVCameraConfig
 
 # Module-level constants
-DEFAULT_ROBOT_TYPE: Final[str] = "so101" # "so100", "so101"
+DEFAULT_ROBOT_TYPE: Final[str] = "so101" # "so100", "so101", "so101_sim" (simulated arm, no hardware needed)
 DEFAULT_SERIAL_PORT: Final[str] = "/dev/tty.usbmodem59090526531" # only for SO ARM
 
 
@@ -46,6 +46,148 @@ class RobotConfig:
         }
     )
 
+
+    # Per-camera capture threads
+    # How long the first image request waits for a camera to deliver its first frame
+    # How long a request for a frame newer than a given time waits before using the latest one
+    CAMERA_CAPTURE: Dict[str, float] = field(
+        default_factory=lambda: {
+            "FIRST_FRAME_TIMEOUT_S": 2.0,
+            "WAIT_TIMEOUT_S": 1.0,
+        }
+    )
+   
+    # Settle detection before capturing images after a move, replaces a fixed one second wait
+    # Settled means every joint moves slower than MAX_VELOCITY_DEG_S for STABLE_SAMPLES polls in a row, wherever it stopped
+    # (a loaded servo can hold a few degrees off its command); joints further than MAX_ERROR_DEG from the command are
+    # reported with the images, except the gripper since a grasped object blocks it
+    SETTLE: Dict[str, Any] = field(
+        default_factory=lambda: {
+            "POLL_INTERVAL_S": 0.02,
+            "MAX_VELOCITY_DEG_S": 2.0,
+            "MAX_ERROR_DEG": 1.5,
+            "STABLE_SAMPLES": 3,
+            "TIMEOUT_S": 3.0,
+            "IGNORE_ERROR_JOINTS": ["gripper"],
+        }
+    )
+
+    # Simulated follower used when the robot type is "so101_sim"
+    # Latencies are per bus transaction, joints follow their goal with TIME_CONSTANT_S lag up to MAX_SPEED_NORM_S
+    # (normalized units per second), the arm starts at INITIAL_PRESET
+    SIMULATION: Dict[str, Any] = field(
+        default_factory=lambda: {
+            "READ_LATENCY_S": 0.002,
+            "WRITE_LATENCY_S": 0.001,
+            "MAX_SPEED_NORM_S": 150.0,
+            "TIME_CONSTANT_S": 0.05,
+            "INITIAL_PRESET": "1",
+        }
+    )
+
+    # Asynchronous logging, records are written by a background thread and dropped when QUEUE_SIZE are waiting
+    # EVENTS limits high-frequency events: at most RATE_PER_S records per second and one in SAMPLE_EVERY
+    LOGGING: Dict[str, Any] = field(
+        default_factory=lambda: {
+            "LEVEL": "INFO",
+            "QUEUE_SIZE": 10000,
+            "EVENTS": {
+                "move_result": {"RATE_PER_S": 5.0},
+                "trajectory_step": {"RATE_PER_S": 10.0, "SAMPLE_EVERY": 10},
+                "tool_call": {"RATE_PER_S": 20.0},
+            },
+        }
+    )
+
+    # Tracing spans for tool calls, toggled at runtime with the set_tracing MCP tool
+    # ENABLED starts tracing with the server, each session is written to DIR as Chrome/Perfetto trace JSON
+    TRACING: Dict[str, Any] = field(
+        default_factory=lambda: {
+            "ENABLED": False,
+            "DIR": os.path.join(os.path.dirname(os.path.abspath(__file__)), "traces"),
+            "MAX_EVENTS": 200000,
+        }
+    )
+
+    # Continuous keyboard jogging (keyboard.py --jog)
+    # Speeds while a key is held, RAMP_TIME_S is how long it takes to reach them from standstill (and to stop)
+    JOG: Dict[str, float] = field(
+        default_factory=lambda: {
+            "RATE_HZ": 100.0,
+            "LINEAR_MM_S": 40.0,
+            "ANGULAR_DEG_S": 45.0,
+            "GRIPPER_PCT_S": 50.0,
+            "RAMP_TIME_S": 0.15,
+        }
+    )
+
+    # Motion scripts (run_motion_script MCP tool), longer scripts are rejected before anything moves
+    MOTION_SCRIPT: Dict[str, Any] = field(
+        default_factory=lambda: {
+            "MAX_STEPS": 20,
+        }
+    )
+   
+    # How camera frames are sent to the model, per camera name with "default" for the rest
+    # Frames are downscaled to fit MAX_WIDTH x MAX_HEIGHT (never upscaled) before JPEG encoding
+    # INPUT_COLOR is the channel order the camera delivers ("RGB" or "BGR"), GRAYSCALE drops colour entirely
+    CAMERA_OUTPUT_PROFILES: Dict[str, Dict[str, Any]] = field(
+        default_factory=lambda: {
+            "default": {
+                "MAX_WIDTH": 768,
+                "MAX_HEIGHT": 768,
+                "JPEG_QUALITY": 80,
+                "GRAYSCALE": False,
+                "INPUT_COLOR": "RGB",
+                "CHROMA_SUBSAMPLING": "4:2:0",
+            },
+            "wrist": {"JPEG_QUALITY": 85},
+        }
+    )
+
+    # Threads encoding camera frames for MCP responses, 0 uses one per CPU core
+    IMAGE_ENCODER_WORKERS: int = 0
+
+    # Views that look the same as the last image sent for that camera are replaced by a short text part
+    # Frames are compared as THUMB_WIDTH wide grayscale thumbnails: the view changed when more than MAX_CHANGED_FRACTION
+    # of the thumbnail pixels differ by more than PIXEL_THRESHOLD levels (after removing a global brightness shift)
+    FRAME_CHANGE_DETECTION: Dict[str, Any] = field(
+        default_factory=lambda: {
+            "ENABLED": True,
+            "THUMB_WIDTH": 96,
+            "PIXEL_THRESHOLD": 12,
+            "MAX_CHANGED_FRACTION": 0.001,
+        }
+    )
+
+    # Send all camera views as one labeled mosaic (camera name and capture time burned in) instead of one image each
+    # The mosaic fits MAX_WIDTH x MAX_HEIGHT, LAYOUTS gives [columns, rows] per camera count, other counts use a
+    # near-square grid; the per-camera output profiles do not apply, the mosaic is encoded with JPEG_QUALITY
+    CAMERA_MOSAIC: Dict[str, Any] = field(
+        default_factory=lambda: {
+            "ENABLED": False,
+            "MAX_WIDTH": 1024,
+            "MAX_HEIGHT": 768,
+            "JPEG_QUALITY": 80,
+            "LAYOUTS": {1: [1, 1], 2: [1, 2], 3: [2, 2], 4: [2, 2]},
+        }
+    )
+
+    # Region-of-interest crops per camera: when a rule matches, the camera is sent as a THUMB_WIDTH wide thumbnail of
+    # the whole frame plus BOX cropped at camera resolution; the crop is only downscaled to fit CROP_MAX_WIDTH x
+    # CROP_MAX_HEIGHT instead of the camera's output profile (which bounds it when these are left out)
+    # BOX is (left, top, right, bottom) as fractions of the frame; rules are checked in order and the first one whose
+    # ZONES contain the distance zone reported with move_robot (any zone when empty) and whose GRIPPER_OPENNESS_PCT
+    # range holds the commanded gripper openness is used, cameras without a matching rule are sent whole
+    CAMERA_ROI: Dict[str, Any] = field(
+        default_factory=lambda: {
+            "wrist": [
+                # approaching with an open gripper: the fingers and the object between them
+                {"ZONES": ["near", "grasp"], "GRIPPER_OPENNESS_PCT": [10, 100], "BOX": [0.2, 0.3, 0.8, 1.0], "THUMB_WIDTH": 384,
+                 "CROP_MAX_WIDTH": 1152, "CROP_MAX_HEIGHT": 768},
+            ],
+        }
+    )
    
     # Format: {motor_name: (norm_min, norm_max, deg_min, deg_max)}
     MOTOR_NORMALIZED_TO_DEGREE_MAPPING: Dict[str, Tuple[float, float, float, float]] = field(
@@ -62,12 +204,49 @@ class RobotConfig:
     # Constants for smooth interpolation
     # Degrees per interpolation step
     # Maximum number of interpolation steps
-    # Delay between interpolation steps (100Hz)
+    # Control period between interpolation steps (100Hz), steps are scheduled against absolute deadlines
+    # Drop waypoints that are already more than one period late instead of replaying them back to back
+    # Gripper travel per step on straight-line cartesian moves (mm)
+    # Max difference between the current pose and its IK solution for a straight-line move (deg)
+    # Velocity profile: "trapezoidal" or "minimum_jerk" use JOINT_MOTION_LIMITS for the shortest allowed move,
+    # "linear" keeps the constant-speed DEGREES_PER_STEP / MAX_INTERPOLATION_STEPS behaviour
+    # A joint-space move that preempts another within HANDOVER_MAX_AGE_S starts at the preempted move's velocity;
+    # it is slowed down to keep the sum within JOINT_MOTION_LIMITS; straight-line and "linear" moves always start from rest
     MOVEMENT_CONSTANTS: Dict[str, Any] = field(
         default_factory=lambda: {
             "DEGREES_PER_STEP": 1.5,           
             "MAX_INTERPOLATION_STEPS": 150,    
             "STEP_DELAY_SECONDS": 0.01,        
+            "SKIP_LATE_STEPS": True,
+            "CARTESIAN_MM_PER_STEP": 1.0,
+            "IK_BRANCH_TOLERANCE_DEG": 2.0,
+            "PROFILE": "trapezoidal",
+            "HANDOVER_MAX_AGE_S": 0.1,
+        }
+    )
+
+    # Per-joint motion limits for the velocity profiles (deg/s, deg/s^2, deg/s^3)
+    # STS3215 servos run about 270 deg/s unloaded and LeRobot sets their acceleration register to 254
+    # (25400 steps/s^2, about 2230 deg/s^2), the shoulder lift carries the arm and gets less
+    # Jerk is only used by the minimum_jerk profile
+    JOINT_MOTION_LIMITS: Dict[str, Dict[str, float]] = field(
+        default_factory=lambda: {
+            "shoulder_pan":  {"MAX_VEL_DEG_S": 270.0, "MAX_ACC_DEG_S2": 2200.0, "MAX_JERK_DEG_S3": 60000.0},
+            "shoulder_lift": {"MAX_VEL_DEG_S": 240.0, "MAX_ACC_DEG_S2": 2000.0, "MAX_JERK_DEG_S3": 50000.0},
+            "elbow_flex":    {"MAX_VEL_DEG_S": 270.0, "MAX_ACC_DEG_S2": 2200.0, "MAX_JERK_DEG_S3": 60000.0},
+            "wrist_flex":    {"MAX_VEL_DEG_S": 270.0, "MAX_ACC_DEG_S2": 2200.0, "MAX_JERK_DEG_S3": 60000.0},
+            "wrist_roll":    {"MAX_VEL_DEG_S": 270.0, "MAX_ACC_DEG_S2": 2200.0, "MAX_JERK_DEG_S3": 60000.0},
+            "gripper":       {"MAX_VEL_DEG_S": 270.0, "MAX_ACC_DEG_S2": 2200.0, "MAX_JERK_DEG_S3": 60000.0},
+        }
+    )
+    
+    # Background joint polling used by the MCP server
+    # Tools reuse the cached snapshot when it is younger than MAX_STALENESS_S
+    STATE_OBSERVER: Dict[str, Any] = field(
+        default_factory=lambda: {
+            "ENABLED": True,
+            "RATE_HZ": 20.0,
+            "MAX_STALENESS_S": 0.2,
         }
     )
     
@@ -99,6 +278,26 @@ class RobotConfig:
         }
     )
 
+    # Camera viewpoints of the inspection tools, per target {viewpoint name: joint positions in degrees}
+    # dimm_protocol / cpu_protocol move to one viewpoint, inspection_tour visits every viewpoint of a target
+    INSPECTION_VIEWPOINTS: Dict[str, Dict[str, Dict[str, float]]] = field(
+        default_factory=lambda: {
+            "dimm": {
+                "1": { "gripper": 0, "wrist_roll": -22.0, "wrist_flex": 72.0, "elbow_flex": 135.0, "shoulder_lift": 144.0, "shoulder_pan": 103.0 },
+                "2": { "gripper": 0, "wrist_roll": -23.0, "wrist_flex": 50.0, "elbow_flex": 80.0, "shoulder_lift": 101.0, "shoulder_pan": 83.0 },
+                "3": { "gripper": 0, "wrist_roll": -3.0, "wrist_flex": -14.0, "elbow_flex": 0.0, "shoulder_lift": 61.0, "shoulder_pan": 94.0 },
+                "4": { "gripper": 0, "wrist_roll": -3.0, "wrist_flex": 98.0, "elbow_flex": 145.0, "shoulder_lift": 134.0, "shoulder_pan": 88.0 },
+            },
+            "cpu": {
+                "1": { "gripper": 0, "wrist_roll": -8.0, "wrist_flex": 35.0, "elbow_flex": 75.0, "shoulder_lift": 105.0, "shoulder_pan": 90.0 },
+                "2": { "gripper": 0, "wrist_roll": -12.0, "wrist_flex": 70.0, "elbow_flex": 115.0, "shoulder_lift": 130.0, "shoulder_pan": 92.0 },
+                "3": { "gripper": 0, "wrist_roll": -15.0, "wrist_flex": 20.0, "elbow_flex": 50.0, "shoulder_lift": 85.0, "shoulder_pan": 91.0 },
+                "4": { "gripper": 0, "wrist_roll": -5.0, "wrist_flex": 55.0, "elbow_flex": 95.0, "shoulder_lift": 115.0, "shoulder_pan": 88.0 },
+                "5": { "gripper": 0, "wrist_roll": -18.0, "wrist_flex": 85.0, "elbow_flex": 125.0, "shoulder_lift": 135.0, "shoulder_pan": 94.0 },
+            },
+        }
+    )
+
     # Robot description for AI/LLM context
     robot_description: str = ("""
 Follow these instructions precisely. Never deviate.
@@ -163,6 +362,7 @@ Items will generally be placed in the 3rd and 4th column. The robot is always in
 - Close gripper completely to grab objects
 - Split into smaller steps and reanalyze visual feedback after each one
 - Use only the latest images to evaluate success and distance
+- Every result with images has a response_number and camera_images: which "Image N" of that result shows each camera, or which image of an earlier response still shows an unchanged view
 - Move above object with gripper tilted up (10–15°) to avoid collisions. Stay >25 cm above ground when moving or rotating
 - Never move with gripper near the ground
 - When object is inside gripper, it will not be visible and will cover the whole wrist camera view
@@ -1,8 +1,8 @@
 import sys
 import time
 import logging
-from controller_for_arm import ControlRobot
-from config_robot import RobotConfig
+from controller_for_arm import RobotController
+from config_robot import robot_config
 import os
 
 
@@ -63,7 +63,7 @@ def print_robot_state(controller):
     print(f"{'Joint Name':<18} | {'Norm Range':<15} | {'Degree Range'}")
     print("-" * 60)
     
-    for joint_name, (norm_min, norm_max, deg_min, deg_max) in RobotConfig.motors_to_degrees.items():
+    for joint_name, (norm_min, norm_max, deg_min, deg_max) in robot_config.MOTOR_NORMALIZED_TO_DEGREE_MAPPING.items():
         print(f"{joint_name:<18} | {norm_min:>4.0f} to {norm_max:>4.0f}   | {deg_min:>6.1f}° to {deg_max:>6.1f}°")
     
     print(f"\n Press Ctrl+C to exit")
@@ -80,7 +80,7 @@ def main():
     try:
         # Initialize robot controller in READ-ONLY mode
         print("\n Connecting to robot...")
-        with ControlRobot(read_only=True) as controller:
+        with RobotController(read_only=True) as controller:
             print(f" Connected to {controller.robot_type}")
             print(" TORQUE DISABLED: Robot can now be moved manually!")
             print(" Starting position monitoring...")
@@ -1,6 +1,10 @@
 import logging
-import json
-from typing import Dict, List, Optional, Any
+import math
+import asyncio
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Any
 import numpy as np
 from dataclasses import dataclass, field
 import time
@@ -12,10 +16,19 @@ from lerobot.robots.so101_follower import SO101Follower, SO101FollowerConfig
 #---------------------------written classes------------------
 from config_robot import robot_config
 from only_kin import KinematicsM
+from joint_conv import JointConverter
+from state_observer import StateObserver, StateSnapshot
+from camera_capture import CameraCapture, CameraFrame, start_captures
+from motion_profile import sample_progress, synchronized_timing
+from log_pipeline import LazyJson, configure_logging, log_event
+from tracing import traced
+from sim_robot import SimulatedSO101Follower, SimulatedSO101FollowerConfig
+from motion_script import ScriptStep
 
 # Configure logging only if not already configured
 if not logging.getLogger().handlers:
-    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
+    configure_logging("%(asctime)s %(levelname)s: %(message)s", level=getattr(logging, robot_config.LOGGING["LEVEL"]),
+                      queue_size=robot_config.LOGGING["QUEUE_SIZE"], event_limits=robot_config.LOGGING["EVENTS"])
 logger = logging.getLogger(__name__)
 
 
@@ -28,7 +41,9 @@ class MoveResult:
     msg: str
     warnings: List[str] = field(default_factory=list)
     robot_state: Dict[str, Any] = field(default_factory=dict)
+    timing: Dict[str, Any] = field(default_factory=dict)
 
+    @traced("MoveResult.to_json")
     def to_json(self) -> Dict[str, Any]:
         json_output: Dict[str, Any] = {
             "robot_state": self.robot_state or {"error": "Robot state not available."}
@@ -39,14 +54,62 @@ class MoveResult:
             json_output["message"] = self.msg
         if self.warnings:
             json_output["warnings"] = self.warnings
+        if self.timing:
+            json_output["timing"] = self.timing
 
-        # Single point of logging for the returned JSON
-        logger.info(f"MoveResult JSON: {json.dumps(json_output)}")
+        # Single point of logging for the returned JSON, serialized on the log writer thread only if emitted
+        log_event(logger, logging.INFO, "move_result", "MoveResult JSON: %s", LazyJson(json_output))
         return json_output
 
+
+#a fully planned and validated move, ready to be streamed to the bus
+@dataclass
+class TrajectoryPlan:
+    names: List[str]
+    positions_deg: np.ndarray  # (steps x joints) in degrees, columns follow names
+    actions: List[Dict[str, float]]  # one lerobot action per step
+    duration_s: float = 0.0  # planned time from the first to the last step
+
+    @property
+    def steps(self) -> int:
+        return len(self.actions)
+
+
+#handle for a move running on the motion thread, it can be awaited, polled or cancelled
+class MotionHandle:
+
+    def __init__(self) -> None:
+        self.future: Future = Future()
+        self.cancel_event = threading.Event()
+        self.cancel_reason = ""
+
+    #stop the move at the next control step, the arm holds the last commanded pose
+    def cancel(self, reason: str = "cancelled") -> None:
+        if not self.cancel_event.is_set():
+            self.cancel_reason = reason
+            self.cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    #block until the move finishes and return its MoveResult
+    def result(self, timeout: Optional[float] = None) -> MoveResult:
+        return self.future.result(timeout)
+
+    def add_done_callback(self, fn: Callable[[Future], None]) -> None:
+        self.future.add_done_callback(fn)
+
+    def __await__(self):
+        return asyncio.wrap_future(self.future).__await__()
+
 class RobotController:
     # Robot type mapping
-    ROBOT_TYPES = {"so100": (SO100Follower, SO100FollowerConfig),"so101": (SO101Follower, SO101FollowerConfig),}
+    ROBOT_TYPES = {"so100": (SO100Follower, SO100FollowerConfig),"so101": (SO101Follower, SO101FollowerConfig),
+                   "so101_sim": (SimulatedSO101Follower, SimulatedSO101FollowerConfig),}
 
     def __init__(self, read_only: bool = False):
         self.robot_type = robot_config.lerobot_config.get("type")
@@ -59,10 +122,17 @@ class RobotController:
         self.motor_mapping = robot_config.MOTOR_NORMALIZED_TO_DEGREE_MAPPING
         #get joint 
         self.names_of_joint = list(self.motor_mapping.keys())
+        #precompiled degree/normalized conversion and range limits
+        self.converter = JointConverter(self.motor_mapping)
         #get presets
         self.presets = robot_config.PRESET_POSITIONS
         #for smooth interpolation
         self.movement_constant = robot_config.MOVEMENT_CONSTANTS
+        #per-joint velocity, acceleration and jerk limits in converter column order
+        joint_limits = robot_config.JOINT_MOTION_LIMITS
+        self.max_vel = np.array([joint_limits[name]["MAX_VEL_DEG_S"] for name in self.names_of_joint], dtype=np.float64)
+        self.max_acc = np.array([joint_limits[name]["MAX_ACC_DEG_S2"] for name in self.names_of_joint], dtype=np.float64)
+        self.max_jerk = np.array([joint_limits[name]["MAX_JERK_DEG_S3"] for name in self.names_of_joint], dtype=np.float64)
         
         # Initialize kinematics
         kinematic_params = robot_config.KINEMATIC_PARAMS.get(
@@ -80,6 +150,27 @@ class RobotController:
              self.positions_norm[name]= 0.0 
         #set up cartesian
         self.cartesian_mm: Dict[str, float] = {"x": 0.0, "z": 0.0}
+        #time.monotonic() the three above were last written, an older observer snapshot must not overwrite them
+        self._positions_at = 0.0
+        #last pose sent to the arm, new moves are planned from here so a preempting move starts without a jump
+        self.commanded_deg: Dict[str, float] = dict(self.positions_deg)
+
+        #serial bus is shared between the motion thread and state/camera readers
+        self.bus_lock = threading.RLock()
+        #motion runs on its own thread so callers can poll, await or preempt it
+        self._motion_queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._motion_thread: Optional[threading.Thread] = None
+        self._motion_lock = threading.Lock()
+        self._active_motion: Optional[MotionHandle] = None
+        self._current_motion: Optional[MotionHandle] = None
+        #joint velocities (deg/s) of the last preempted move and when it stopped, the preempting move starts from them
+        self._handover: Optional[tuple[Dict[str, float], float]] = None
+
+        #background joint polling, only runs after start_state_observer() but also serves synchronous snapshot reads
+        self.state_observer = StateObserver(self.read_state_snapshot, robot_config.STATE_OBSERVER["RATE_HZ"])
+        #one capture thread per camera, started by the first image request
+        self.camera_captures: Dict[str, CameraCapture] = {}
+        self._camera_lock = threading.Lock()
         
     
         # In read-only mode, connect and disable torque for manual movement
@@ -155,59 +246,94 @@ class RobotController:
     
     #degree to normalized values
     def degree_to_norm(self, joint_name: str, degrees: float) -> float:
-        norm_min, norm_max, deg_min, deg_max = self.motor_mapping[joint_name]
-        if deg_max == deg_min:
-            return norm_min
-        ans = norm_min + ((degrees - deg_min) * (norm_max - norm_min)) / (deg_max - deg_min)
-        return ans
+        scale, offset = self.converter.d2n[joint_name]
+        return degrees * scale + offset
 
     #normalized values to degree
     def norm_to_deg(self, joint_name: str, normalized: float) -> float:
         """Convert normalized value to degrees."""
-        norm_min, norm_max, deg_min, deg_max = self.motor_mapping[joint_name]
-        if norm_max == norm_min:
-            return deg_min
-        degree_value = deg_min + ((normalized - norm_min) * (deg_max - deg_min)) / (norm_max - norm_min)
-        return degree_value
+        scale, offset = self.converter.n2d[joint_name]
+        return normalized * scale + offset
 
     #check if the target postion is capable of being executed 
     def check_if_valid_position(self, positions_deg: Dict[str, float]) -> tuple[bool, str]:
-    
-        errors = []
-        
-        for jn, dv in positions_deg.items():
-            if jn not in self.motor_mapping:
-                continue
-                
-            norm_value = self.degree_to_norm(jn, dv)
+        names = [jn for jn in positions_deg if jn in self.motor_mapping]
+        if not names:
+            return True, ""
 
-            if jn == "gripper":
-                norm_min, norm_max = -20, 100
-            else:
-                norm_min, norm_max = -100, 100
-            
-            # Handle inverted ranges (where norm_min > norm_max)
-            actual_min = min(norm_min, norm_max)
-            actual_max = max(norm_min, norm_max)
-            
-            if norm_value < actual_min or norm_value > actual_max:
-                errors.append(f"{jn.replace('_', ' ').title()} position {dv:.1f}° " f"(normalized: {norm_value:.1f}) is outside valid range "f"{actual_min:.1f} to {actual_max:.1f}")
-        
-        if errors:
-            return False, "Movement impossible - out of range: " + "; ".join(errors)
-        
-        return True, ""
+        cols = self.converter.columns(names)
+        _, is_valid, error_msg, _ = self.converter.convert_and_validate([positions_deg[jn] for jn in names], cols)
+        return is_valid, error_msg
     
     #we store the moves we want to make in lerobot
     def build_and_store_action(self, positions_deg: Dict[str, float]) -> Dict[str, float]:
-        action = {}
-        
-        for name, deg in positions_deg.items():
-            norm_val = self.degree_to_norm(name, deg)
-            pos_key = f"{name}.pos"
-            action[pos_key] = norm_val
-                
-        return action
+        names = list(positions_deg.keys())
+        cols = self.converter.columns(names)
+        norm_vals = self.converter.deg_to_norm([positions_deg[name] for name in names], cols)
+        return self.converter.to_actions(norm_vals, cols)[0]
+
+    #read the normalized joint positions from the arm {joint_name: normalized}
+    #fast path: a single sync read of Present_Position on the motor bus, no camera frames are grabbed
+    @traced("controller.read_joints")
+    def read_joint_positions_norm(self) -> Dict[str, float]:
+        bus = getattr(self.robot, "bus", None)
+        if bus is not None:
+            with self.bus_lock:
+                present = bus.sync_read("Present_Position")
+            return {name: present[name] for name in self.names_of_joint if name in present}
+
+        # robots without a direct bus handle only expose the full observation
+        with self.bus_lock:
+            observation = self.robot.get_observation()
+
+        # SO100/SO101: direct observation keys
+        positions_norm = {}
+        for joint_name in self.names_of_joint:
+            pos_key = f"{joint_name}.pos"
+            if pos_key in observation:
+                positions_norm[joint_name] = observation[pos_key]
+        return positions_norm
+
+    #current joint positions in degrees straight from the bus {joint_name: degrees}
+    def read_joint_positions(self) -> Dict[str, float]:
+        positions_norm = self.read_joint_positions_norm()
+        names = list(positions_norm.keys())
+        degrees = self.converter.norm_to_deg([positions_norm[name] for name in names], self.converter.columns(names))
+        return dict(zip(names, degrees.tolist()))
+
+    #read the arm into a new immutable snapshot, used by the state observer
+    @traced("controller.read_state_snapshot")
+    def read_state_snapshot(self, version: int) -> StateSnapshot:
+        if not self.robot:
+            raise RuntimeError("Arm not connected")
+
+        positions_norm = self.read_joint_positions_norm()
+        timestamp = time.monotonic()
+
+        names = list(positions_norm.keys())
+        degrees = self.converter.norm_to_deg([positions_norm[name] for name in names], self.converter.columns(names))
+        positions_deg = dict(zip(names, degrees.tolist()))
+
+        fk_x, fk_z = self.kinematics.forward_kin(positions_deg.get("shoulder_lift", 0.0), positions_deg.get("elbow_flex", 0.0))
+        cartesian_mm = {"x": fk_x, "z": fk_z}
+        return StateSnapshot.build(version, timestamp, positions_deg, positions_norm, cartesian_mm,
+                                   self.human_readable_from(positions_deg, cartesian_mm))
+
+    #start polling the joints in the background, readers then get cached snapshots without touching the bus
+    def start_state_observer(self, rate_hz: Optional[float] = None) -> StateObserver:
+        if rate_hz is not None:
+            self.state_observer.period = 1.0 / rate_hz
+        self.state_observer.start()
+        return self.state_observer
+
+    def stop_state_observer(self) -> None:
+        self.state_observer.stop()
+
+    #latest state snapshot, max_staleness_s forces a fresh read when the cached one is older (any age when None)
+    def get_state_snapshot(self, max_staleness_s: Optional[float] = None) -> StateSnapshot:
+        if not self.state_observer.running:
+            return self.state_observer.refresh()
+        return self.state_observer.get(max_staleness_s)
 
     #refresh robot state
     def refresh_state(self) -> None:
@@ -215,20 +341,19 @@ class RobotController:
             return
             
         try:
-            observation = self.robot.get_observation()
-        
-            # SO100/SO101: direct observation keys
-            for joint_name in self.names_of_joint:
-                    pos_key = f"{joint_name}.pos"
-                    if pos_key in observation:
-                        norm_val = observation[pos_key]
-                        self.positions_norm[joint_name] = norm_val
-                        self.positions_deg[joint_name] = self.norm_to_deg(joint_name, norm_val)
+            for joint_name, norm_val in self.read_joint_positions_norm().items():
+                self.positions_norm[joint_name] = norm_val
+                self.positions_deg[joint_name] = self.norm_to_deg(joint_name, norm_val)
             
             # Update cartesian coordinates
             fk_x, fk_z = self.kinematics.forward_kin(self.positions_deg["shoulder_lift"],self.positions_deg["elbow_flex"])
             
             self.cartesian_mm = {"x": fk_x, "z": fk_z}
+            self._positions_at = time.monotonic()
+
+            # while idle the measured pose is the starting point of the next move
+            if not self.is_moving():
+                self.commanded_deg.update(self.positions_deg)
             
         except Exception as e:
             logger.error(f"Failed to read robot state: {e}", exc_info=True)
@@ -237,6 +362,10 @@ class RobotController:
     def convert_to_human_readable(self) -> Dict[str, float]:
         positions_deg = getattr(self, 'positions_deg', {name: 0.0 for name in getattr(self, 'names_of_joint', [])})
         cartesian_mm = getattr(self, 'cartesian_mm', {"x": 0.0, "z": 0.0})
+        return self.human_readable_from(positions_deg, cartesian_mm)
+
+    @staticmethod
+    def human_readable_from(positions_deg: Dict[str, float], cartesian_mm: Dict[str, float]) -> Dict[str, float]:
         ans = {}
         
         ans['robot_rotation_clockwise_deg'] = positions_deg.get("shoulder_pan", 0.0) - 90
@@ -249,6 +378,7 @@ class RobotController:
         return ans
 
     #ensure all the states are valid
+    @traced("controller.get_full_state")
     def get_full_state(self) -> Dict[str, Any]:
         # Ensure all state dictionaries exist
         positions_deg = getattr(self, 'positions_deg', {})
@@ -282,12 +412,140 @@ class RobotController:
         return ans
 
      #get current robot state and pass it back to movement class
-    def get_current_robot_state(self) -> MoveResult:
+     #with the observer running the cached snapshot is used, max_staleness_s bounds how old it may be
+    def get_current_robot_state(self, max_staleness_s: Optional[float] = None) -> MoveResult:
+        if self.state_observer.running:
+            try:
+                snapshot = self.state_observer.get(max_staleness_s)
+            except Exception as e:
+                logger.error(f"Failed to read robot state: {e}", exc_info=True)
+                return MoveResult(False, f"Failed to read robot state: {e}", robot_state=self.get_full_state())
+            self.apply_snapshot(snapshot)
+            return MoveResult(True, "Current robot state retrieved.", robot_state=snapshot.to_state_dict())
+
         self.refresh_state()
         return MoveResult(True, "Current robot state retrieved.", robot_state=self.get_full_state())
 
+    #block until the arm has stopped: every joint slower than MAX_VELOCITY_DEG_S for STABLE_SAMPLES polls in a row,
+    #or until the timeout; a joint that gravity or a grasped object holds off its command still counts as stopped,
+    #joints further than MAX_ERROR_DEG from the command are reported in off_target_deg instead
+    #settled_at is the time.monotonic() of the first stable sample, ask the cameras for frames newer than that
+    @traced("controller.wait_until_settled")
+    def wait_until_settled(self, timeout_s: Optional[float] = None) -> Dict[str, Any]:
+        settle_cfg = robot_config.SETTLE
+        timeout_s = settle_cfg["TIMEOUT_S"] if timeout_s is None else timeout_s
+        start = time.monotonic()
+        deadline = start + timeout_s
+
+        # a queued or streaming move has to finish before the arm can settle
+        # a checkpoint of a motion script waits from inside its own motion, that one is already between steps
+        active = self._active_motion
+        if active is not None and threading.current_thread() is not self._motion_thread:
+            try:
+                active.result(timeout=max(0.0, deadline - time.monotonic()))
+            except Exception:
+                pass
+
+        error_joints = [name for name in self.names_of_joint if name not in settle_cfg["IGNORE_ERROR_JOINTS"]]
+        previous: Optional[Dict[str, float]] = None
+        previous_time = 0.0
+        stable = 0
+        settled_at = None
+        max_velocity = float("nan")
+        while True:
+            now = time.monotonic()
+            positions = self.read_joint_positions()
+            if previous is not None and now > previous_time:
+                max_velocity = max(abs(positions[name] - previous[name]) for name in positions) / (now - previous_time)
+                if max_velocity <= settle_cfg["MAX_VELOCITY_DEG_S"]:
+                    if stable == 0:
+                        settled_at = previous_time
+                    stable += 1
+                else:
+                    stable = 0
+            previous, previous_time = positions, now
+
+            settled = stable >= settle_cfg["STABLE_SAMPLES"]
+            if settled or now >= deadline:
+                errors = {name: positions[name] - self.commanded_deg[name] for name in error_joints if name in positions}
+                return {"settled": settled, "settled_at": settled_at if settled else time.monotonic(),
+                        "settle_time_s": round(time.monotonic() - start, 3), "max_velocity_deg_s": round(max_velocity, 2),
+                        "max_error_deg": round(max((abs(error) for error in errors.values()), default=0.0), 2),
+                        "off_target_deg": {name: round(error, 1) for name, error in errors.items() if abs(error) > settle_cfg["MAX_ERROR_DEG"]}}
+            time.sleep(settle_cfg["POLL_INTERVAL_S"])
+
+    #------------------------------motion thread------------------------------
+
+    #true while a move is queued or streaming
+    def is_moving(self) -> bool:
+        active = self._active_motion
+        return active is not None and not active.done()
+
+    #queue fn on the motion thread, a newer command preempts the running one at its next control step
+    def submit_motion(self, fn: Callable[..., MoveResult], *args: Any, **kwargs: Any) -> MotionHandle:
+        handle = MotionHandle()
+        with self._motion_lock:
+            if self._motion_thread is None or not self._motion_thread.is_alive():
+                self._motion_thread = threading.Thread(target=self._motion_loop, name="motion", daemon=True)
+                self._motion_thread.start()
+            if self._active_motion is not None and not self._active_motion.done():
+                self._active_motion.cancel("preempted")
+            self._active_motion = handle
+            self._motion_queue.put((handle, fn, args, kwargs))
+        return handle
+
+    #run a motion synchronously, still through the motion thread so it preempts anything in flight
+    def _run_blocking(self, fn: Callable[..., MoveResult], *args: Any, **kwargs: Any) -> MoveResult:
+        # nested call from the motion thread itself, queueing would deadlock
+        if threading.current_thread() is self._motion_thread:
+            return fn(*args, **kwargs)
+        return self.submit_motion(fn, *args, **kwargs).result()
+
+    #cancel whatever is moving and wait for the arm to hold its last commanded pose
+    def stop_motion(self, timeout: Optional[float] = None) -> None:
+        with self._motion_lock:
+            active = self._active_motion
+        if active is not None and not active.done():
+            active.cancel("cancelled")
+            try:
+                active.result(timeout)
+            except Exception as e:
+                logger.warning(f"Motion did not stop cleanly: {e}")
+
+    def _motion_loop(self) -> None:
+        while True:
+            job = self._motion_queue.get()
+            if job is None:
+                return
+            handle, fn, args, kwargs = job
+            if handle.cancelled:
+                handle.future.set_result(MoveResult(False, f"Move {handle.cancel_reason} before it started", robot_state=self.get_full_state()))
+                continue
+
+            self._current_motion = handle
+            try:
+                result = fn(*args, **kwargs)
+                if handle.cancelled and result.ok:
+                    result = MoveResult(False, f"Move {handle.cancel_reason}", result.warnings, result.robot_state, result.timing)
+                handle.future.set_result(result)
+            except BaseException as e:
+                handle.future.set_exception(e)
+            finally:
+                self._current_motion = None
+
+    #------------------------------motion commands------------------------------
+    #the plain methods block until the move is done, the *_async variants return a MotionHandle right away
+
     #set points absolute 
     def set_joints_absolute(self, positions_deg: Dict[str, float], use_interpolation: bool = True) -> MoveResult:
+        return self._run_blocking(self._set_joints_absolute, positions_deg, use_interpolation)
+
+    def set_joints_absolute_async(self, positions_deg: Dict[str, float], use_interpolation: bool = True) -> MotionHandle:
+        return self.submit_motion(self._set_joints_absolute, positions_deg, use_interpolation)
+
+    #plan: an already validated trajectory ending at positions_deg (e.g. a straight-line cartesian path)
+    @traced("controller.set_joints_absolute")
+    def _set_joints_absolute(self, positions_deg: Dict[str, float], use_interpolation: bool = True, plan: Optional[TrajectoryPlan] = None) -> MoveResult:
         if self.read_only:
             return MoveResult(False, "Arm in read-only mode", robot_state=self.get_full_state())
             
@@ -309,69 +567,339 @@ class RobotController:
         if not is_valid:
             return MoveResult(False, error_msg, robot_state=self.get_full_state())
 
+        # Plan and validate the whole trajectory before anything is sent to the arm
+        if use_interpolation and plan is None:
+            try:
+                plan = self.plan_interpolated_trajectory(valid_positions)
+            except ValueError as e:
+                return MoveResult(False, str(e), robot_state=self.get_full_state())
+
+        timing = {}
         try:
             if use_interpolation:
-                self.interpolated_movement(valid_positions)
+                timing = self.interpolated_movement(valid_positions, plan=plan)
             else:
                 action = self.build_and_store_action(valid_positions)
-                self.robot.send_action(action)
-            
+                with self.bus_lock:
+                    self.robot.send_action(action)
+
+            # Stopped part way: the arm holds the last waypoint that was actually sent
+            if timing.get("interrupted"):
+                last_step = timing["last_step"]
+                if last_step >= 0:
+                    self.commit_commanded_pose(dict(zip(plan.names, plan.positions_deg[last_step].tolist())))
+                if timing["interrupted"] == "preempted" and last_step >= 1:
+                    velocity = (plan.positions_deg[last_step] - plan.positions_deg[last_step - 1]) / self.movement_constant["STEP_DELAY_SECONDS"]
+                    self._handover = (dict(zip(plan.names, velocity.tolist())), time.monotonic())
+                return MoveResult(False, f"Move {timing['interrupted']} after {timing['steps_sent']}/{timing['steps_planned']} steps",
+                                  robot_state=self.get_full_state(), timing=timing)
+
             # Update state optimistically
-            self.positions_deg.update(valid_positions)
-            for name, deg in valid_positions.items():
-                self.positions_norm[name] = self.degree_to_norm(name, deg)
-            
-            # Update cartesian if needed
-            if "shoulder_lift" in valid_positions or "elbow_flex" in valid_positions:
-                fk_x, fk_z = self.kinematics.forward_kin(self.positions_deg["shoulder_lift"],self.positions_deg["elbow_flex"])
-                self.cartesian_mm = {"x": fk_x, "z": fk_z}
+            self.commit_commanded_pose(valid_positions)
 
         except Exception as e:
             logger.error(f"Move failed: {e}", exc_info=True)
             self.refresh_state()
             return MoveResult(False, f"Move failed: {e}", robot_state=self.get_full_state())
         
-        return MoveResult(True, "Move completed", robot_state=self.get_full_state())
+        return MoveResult(True, "Move completed", robot_state=self.get_full_state(), timing=timing)
+
+    #send one pose straight to the arm without planning, for callers running their own control loop (jogging)
+    #refuses while a planned motion runs so the two never interleave on the bus
+    def send_joint_positions(self, positions_deg: Dict[str, float]) -> tuple[bool, str]:
+        if self.read_only:
+            return False, "Cannot move robot in read-only mode"
+        if not self.robot:
+            return False, "Arm not connected"
+
+        is_valid, error_msg = self.check_if_valid_position(positions_deg)
+        if not is_valid:
+            return False, error_msg
+
+        action = self.build_and_store_action(positions_deg)
+        with self.bus_lock:
+            if self.is_moving():
+                return False, "A planned move is running"
+            self.robot.send_action(action)
+            self.commit_commanded_pose(positions_deg)
+        return True, ""
+
+    #record a pose that was sent to the arm as the current commanded and (optimistic) measured state
+    def commit_commanded_pose(self, positions_deg: Dict[str, float]) -> None:
+        self.commanded_deg.update(positions_deg)
+        self.positions_deg.update(positions_deg)
+        for name, deg in positions_deg.items():
+            self.positions_norm[name] = self.degree_to_norm(name, deg)
+
+        # Update cartesian if needed
+        if "shoulder_lift" in positions_deg or "elbow_flex" in positions_deg:
+            fk_x, fk_z = self.kinematics.forward_kin(self.positions_deg["shoulder_lift"],self.positions_deg["elbow_flex"])
+            self.cartesian_mm = {"x": fk_x, "z": fk_z}
+        self._positions_at = time.monotonic()
+
+    #measured pose of a snapshot as the controller's current pose, unless it already holds a newer one
+    #commanded_deg is left alone: a snapshot read during a move would pull the next move's start back
+    def apply_snapshot(self, snapshot: StateSnapshot) -> None:
+        if snapshot.timestamp < self._positions_at:
+            return
+        self.positions_deg.update(snapshot.joint_positions_deg)
+        self.positions_norm.update(snapshot.joint_positions_norm)
+        self.cartesian_mm = dict(snapshot.cartesian_mm)
+        self._positions_at = snapshot.timestamp
+
+    #progress samples in (0, 1] for one move, spaced by the configured motion profile at the control period
+    #extent is each joint's travel (per unit of progress for curved paths), linear_steps is only used by the "linear" profile
+    def path_fractions(self, names: List[str], extent: np.ndarray, linear_steps: int) -> tuple[np.ndarray, float]:
+        profile = self.movement_constant["PROFILE"]
+        period = self.movement_constant["STEP_DELAY_SECONDS"]
+        if profile == "linear":
+            steps = max(1, min(self.movement_constant["MAX_INTERPOLATION_STEPS"], linear_steps))
+            return np.arange(1, steps + 1, dtype=np.float64) / steps, steps * period
+
+        cols = self.converter.columns(names)
+        timing = synchronized_timing(profile, extent, self.max_vel[cols], self.max_acc[cols], self.max_jerk[cols])
+        return sample_progress(timing, period), timing.duration_s
+
+    #duration of a joint-space move between two poses under the configured profile, without building its waypoints
+    def estimate_move_duration(self, start_positions: Dict[str, float], target_positions: Dict[str, float]) -> float:
+        names = [name for name in target_positions if name in self.names_of_joint]
+        extent = np.array([target_positions[name] - start_positions[name] for name in names], dtype=np.float64)
+        profile = self.movement_constant["PROFILE"]
+        if profile == "linear":
+            steps = int(np.max(np.abs(extent), initial=0.0) / self.movement_constant["DEGREES_PER_STEP"])
+            return max(1, min(self.movement_constant["MAX_INTERPOLATION_STEPS"], steps)) * self.movement_constant["STEP_DELAY_SECONDS"]
+
+        cols = self.converter.columns(names)
+        return synchronized_timing(profile, extent, self.max_vel[cols], self.max_acc[cols], self.max_jerk[cols]).duration_s
+
+    #velocities of a move preempted just now, None when the arm was at rest (or it stopped too long ago to matter)
+    def take_handover(self, names: List[str]) -> Optional[np.ndarray]:
+        handover, self._handover = self._handover, None
+        if handover is None or time.monotonic() - handover[1] > self.movement_constant["HANDOVER_MAX_AGE_S"]:
+            return None
+        velocity = np.array([handover[0].get(name, 0.0) for name in names], dtype=np.float64)
+        return velocity if np.any(velocity) else None
+
+    #carry the velocity of a preempted move into a plan that starts from rest, so preemption is smooth in velocity too
+    #adds v0 * t * (1 - t/T)^2 to every joint: it starts at v0 and fades to zero offset and speed by T, so the end pose
+    #does not change; T lets each joint shed v0 at its acceleration limit. The sum of the two can still go past
+    #JOINT_MOTION_LIMITS, so the plan is slowed down until its sampled velocity and acceleration fit; None when it never does
+    def blend_initial_velocity(self, names: List[str], start: np.ndarray, target: np.ndarray, velocity: np.ndarray) -> Optional[np.ndarray]:
+        profile = self.movement_constant["PROFILE"]
+        period = self.movement_constant["STEP_DELAY_SECONDS"]
+        cols = self.converter.columns(names)
+        max_vel, max_acc, max_jerk = self.max_vel[cols], self.max_acc[cols], self.max_jerk[cols]
+        fade_s = max(2.0 * period, float(np.max(4.0 * np.abs(velocity) / max_acc)))
+
+        for stretch in 1.25 ** np.arange(10):
+            # a plan stretched in time by k reaches max_vel / k and max_acc / k^2
+            timing = synchronized_timing(profile, target - start, max_vel / stretch, max_acc / stretch ** 2, max_jerk / stretch ** 3)
+            fractions = sample_progress(timing, period)
+            steps = max(len(fractions), int(math.ceil(fade_s / period)))
+            fractions = np.concatenate([fractions, np.ones(steps - len(fractions))])
+
+            # row k is sent (k + 1) periods after the pose the preempted move stopped at
+            t = np.minimum(np.arange(1, steps + 1, dtype=np.float64) * period, fade_s)
+            offset = t * (1.0 - t / fade_s) ** 2
+            trajectory_deg = start + (target - start) * fractions[:, None] + offset[:, None] * velocity[None, :]
+
+            sampled_vel = np.diff(np.vstack([start, trajectory_deg]), axis=0) / period
+            sampled_acc = np.diff(np.vstack([velocity, sampled_vel]), axis=0) / period
+            if np.all(np.abs(sampled_vel) <= max_vel * 1.01) and np.all(np.abs(sampled_acc) <= max_acc * 1.01):
+                return trajectory_deg
+        return None
+
+    #build every waypoint of a joint-space move and validate all of them before any motion
+    #start_positions defaults to the commanded pose, scripts plan later steps from where the earlier ones end
+    @traced("controller.plan_interpolated")
+    def plan_interpolated_trajectory(self, target_positions: Dict[str, float], start_positions: Optional[Dict[str, float]] = None) -> TrajectoryPlan:
+        names = list(target_positions.keys())
+        if not names:
+            raise ValueError("No joints to move")
+
+        start_positions = self.commanded_deg if start_positions is None else start_positions
+        start = np.array([start_positions[name] for name in names], dtype=np.float64)
+        target = np.array([target_positions[name] for name in names], dtype=np.float64)
+
+        handover = self.take_handover(names) if start_positions is self.commanded_deg else None
+
+        max_change = float(np.max(np.abs(target - start)))
+        fractions, duration = self.path_fractions(names, target - start, int(max_change / self.movement_constant["DEGREES_PER_STEP"]))
+        trajectory_deg = start + (target - start) * fractions[:, None]
+        if handover is not None and self.movement_constant["PROFILE"] != "linear":
+            blended = self.blend_initial_velocity(names, start, target, handover)
+            if blended is None:
+                logger.warning("Preempted velocity does not fit within JOINT_MOTION_LIMITS, the move starts from rest")
+            else:
+                trajectory_deg = blended
+                duration = len(blended) * self.movement_constant["STEP_DELAY_SECONDS"]
+        steps = len(trajectory_deg)
+
+        cols = self.converter.columns(names)
+        trajectory_norm, is_valid, error_msg, bad_step = self.converter.convert_and_validate(trajectory_deg, cols)
+        if not is_valid:
+            raise ValueError(f"Trajectory rejected at step {bad_step + 1}/{steps} before any motion. {error_msg}")
+
+        return TrajectoryPlan(names, trajectory_deg, self.converter.to_actions(trajectory_norm, cols), duration)
+
+    #sample the straight line from the current to the target (x, z), batch solve IK for every waypoint and keep
+    #the wrist compensation at each sample; the other joints are interpolated linearly alongside
+    #returns None (joint-space fallback) when the current pose is not on the IK branch the path would use
+    @traced("controller.plan_cartesian")
+    def plan_cartesian_trajectory(self, target_positions: Dict[str, float], target_xz: tuple[float, float],
+                                  start_positions: Optional[Dict[str, float]] = None) -> Optional[TrajectoryPlan]:
+        names = list(target_positions.keys())
+        start_positions = self.commanded_deg if start_positions is None else start_positions
+        start_positions = {name: start_positions[name] for name in names}
+        start_sl, start_ef = start_positions["shoulder_lift"], start_positions["elbow_flex"]
+        start_x, start_z = self.kinematics.forward_kin(start_sl, start_ef)
+        target_x, target_z = target_xz
+
+        branch_sl, branch_ef = self.kinematics.inverse_kin(start_x, start_z)
+        tolerance = self.movement_constant["IK_BRANCH_TOLERANCE_DEG"]
+        if abs(branch_sl - start_sl) > tolerance or abs(branch_ef - start_ef) > tolerance:
+            logger.warning("Current pose is off the IK branch, using joint-space interpolation instead of a straight line")
+            return None
+
+        start = np.array([start_positions[name] for name in names], dtype=np.float64)
+        target = np.array([target_positions[name] for name in names], dtype=np.float64)
+        sl_col, ef_col, wf_col = names.index("shoulder_lift"), names.index("elbow_flex"), names.index("wrist_flex")
+
+        # wrist keeps its angle to the ground at every sample, any requested tilt is spread over the path
+        compensated_end = start_positions["wrist_flex"] - ((target_positions["shoulder_lift"] - start_sl) - (target_positions["elbow_flex"] - start_ef))
+        tilt = target_positions["wrist_flex"] - compensated_end
+
+        #joint positions at the given progress along the line
+        def joints_along_line(fractions: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+            xs = start_x + (target_x - start_x) * fractions
+            zs = start_z + (target_z - start_z) * fractions
+            shoulder_lift, elbow_flex = self.kinematics.inverse_kin_batch(xs, zs)
+
+            # everything moves linearly, then the arm joints are overwritten with the IK solution of each sample
+            trajectory = start + (target - start) * fractions[:, None]
+            trajectory[:, sl_col] = shoulder_lift
+            trajectory[:, ef_col] = elbow_flex
+            trajectory[:, wf_col] = start_positions["wrist_flex"] - ((shoulder_lift - start_sl) - (elbow_flex - start_ef)) + tilt * fractions
+            return trajectory, xs, zs
+
+        # joint speed along a straight line is not constant, size the profile by the steepest part of the path
+        dense = np.linspace(0.0, 1.0, 65)
+        dense_trajectory, _, _ = joints_along_line(dense)
+        extent = np.max(np.abs(np.diff(dense_trajectory, axis=0)), axis=0) / (dense[1] - dense[0])
+
+        length = math.hypot(target_x - start_x, target_z - start_z)
+        max_change = float(np.max(np.abs(target - start)))
+        linear_steps = max(int(length / self.movement_constant["CARTESIAN_MM_PER_STEP"]), int(max_change / self.movement_constant["DEGREES_PER_STEP"]))
+        fractions, duration = self.path_fractions(names, extent, linear_steps)
+        steps = len(fractions)
+
+        trajectory_deg, xs, zs = joints_along_line(fractions)
+        valid, reasons = self.kinematics.is_valid_target_cart_batch(xs, zs)
+        if not valid.all():
+            bad_step = int(np.argmin(valid))
+            raise ValueError(f"Straight-line path leaves the workspace at step {bad_step + 1}/{steps}: {reasons[bad_step]}")
+
+        cols = self.converter.columns(names)
+        trajectory_norm, is_valid, error_msg, bad_step = self.converter.convert_and_validate(trajectory_deg, cols)
+        if not is_valid:
+            raise ValueError(f"Trajectory rejected at step {bad_step + 1}/{steps} before any motion. {error_msg}")
+
+        return TrajectoryPlan(names, trajectory_deg, self.converter.to_actions(trajectory_norm, cols), duration)
 
      #make sure movements are smooth
-    def interpolated_movement(self, target_positions: Dict[str, float]) -> None:
+    def interpolated_movement(self, target_positions: Dict[str, float], plan: Optional[TrajectoryPlan] = None) -> Dict[str, Any]:
         if self.read_only:
             raise RuntimeError("Arm is in read-only mode")
             
         if not self.robot:
             raise RuntimeError("Arm not connected")
-            
-        start_positions = {}
-        for name in target_positions.keys():
-            start_positions[name] = self.positions_deg[name]
-        
-        max_change = max(abs(target_positions[name] - start_positions[name]) for name in target_positions.keys())
-        steps = max(1, min(
-            self.movement_constant["MAX_INTERPOLATION_STEPS"],
-            int(max_change / self.movement_constant["DEGREES_PER_STEP"])
-        ))
-       
-        
-        steps = max(1, min(self.movement_constant["MAX_INTERPOLATION_STEPS"],int(max_change / self.movement_constant["DEGREES_PER_STEP"])))
-        
-        interpolated = {}
-        for i in range(1, steps + 1):
-            for name in target_positions.keys():
-                interpolated[name] = start_positions[name] + (target_positions[name] - start_positions[name]) * (i / steps)
-               
-            
-            # Validate each interpolation step to avoid sending invalid commands
-            is_valid, error_msg = self.check_if_valid_position(interpolated)
-            if not is_valid:
-                logger.warning(f"Interpolation step {i}/{steps} would exceed range limits, stopping interpolation")
+
+        # Planning raises before the first send_action, so a bad move never leaves the arm half way
+        if plan is None:
+            plan = self.plan_interpolated_trajectory(target_positions)
+
+        # the send loop only streams precomputed actions
+        return self.stream_trajectory(plan)
+
+    #send a planned trajectory at a fixed rate against absolute deadlines, returns the achieved timing
+    @traced("controller.stream_trajectory")
+    def stream_trajectory(self, plan: TrajectoryPlan) -> Dict[str, Any]:
+        period = self.movement_constant["STEP_DELAY_SECONDS"]
+        skip_late = self.movement_constant.get("SKIP_LATE_STEPS", True)
+        actions = plan.actions
+        last = len(actions) - 1
+
+        send_times: List[float] = []
+        skipped = 0
+        overruns = 0
+        max_lateness = 0.0
+
+        current = self._current_motion
+        interrupted = ""
+
+        # step i is due at start + i * period, so time spent writing to the bus never stretches the period
+        start = time.monotonic()
+        i = 0
+        while i <= last:
+            if current is not None and current.cancelled:
+                interrupted = current.cancel_reason
                 break
-                
-            action = self.build_and_store_action(interpolated)
-            self.robot.send_action(action)
-            time.sleep(self.movement_constant["STEP_DELAY_SECONDS"])
+
+            deadline = start + i * period
+            now = time.monotonic()
+            if now < deadline:
+                time.sleep(deadline - now)
+            else:
+                lateness = now - deadline
+                max_lateness = max(max_lateness, lateness)
+                if lateness > period:
+                    overruns += 1
+                    # drop the waypoints that are already stale, the final pose is always sent
+                    if skip_late:
+                        jump = min(int(lateness / period), last - i)
+                        skipped += jump
+                        i += jump
+
+            with self.bus_lock:
+                self.robot.send_action(actions[i])
+            send_times.append(time.monotonic())
+            log_event(logger, logging.DEBUG, "trajectory_step", "Sent step %d/%d", i + 1, plan.steps)
+            i += 1
+
+        stats = self.timing_stats(send_times, period, plan.steps, skipped, overruns, max_lateness)
+        stats["planned_duration_s"] = round(plan.duration_s, 3)
+        stats["last_step"] = i - 1
+        if interrupted:
+            stats["interrupted"] = interrupted
+        return stats
+
+    #summarize the achieved control rate of one streamed move
+    @staticmethod
+    def timing_stats(send_times: List[float], period: float, planned: int, skipped: int, overruns: int, max_lateness: float) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            "steps_planned": planned,
+            "steps_sent": len(send_times),
+            "steps_skipped": skipped,
+            "overruns": overruns,
+            "nominal_rate_hz": round(1.0 / period, 1) if period > 0 else None,
+            "max_lateness_ms": round(max_lateness * 1000.0, 3),
+        }
+        if len(send_times) > 1:
+            periods = np.diff(np.asarray(send_times))
+            stats["achieved_rate_hz"] = round(float(len(periods) / (send_times[-1] - send_times[0])), 1)
+            stats["mean_period_ms"] = round(float(periods.mean()) * 1000.0, 3)
+            stats["jitter_ms"] = round(float(periods.std()) * 1000.0, 3)
+            stats["max_period_ms"] = round(float(periods.max()) * 1000.0, 3)
+        return stats
 
     #increase the joints by delta 
     def increment_joints_by_delta(self, deltas_deg: Dict[str, float]) -> MoveResult:
+        return self._run_blocking(self._increment_joints_by_delta, deltas_deg)
+
+    def increment_joints_by_delta_async(self, deltas_deg: Dict[str, float]) -> MotionHandle:
+        return self.submit_motion(self._increment_joints_by_delta, deltas_deg)
+
+    def _increment_joints_by_delta(self, deltas_deg: Dict[str, float]) -> MoveResult:
         if self.read_only:
             return MoveResult(False, "Cannot move arm in read-only mode", robot_state=self.get_full_state())
             
@@ -382,12 +910,12 @@ class RobotController:
             if joint_name not in self.names_of_joint:
                 warnings.append(f"Unknown joint '{joint_name}' ignored.")
                 continue
-            target_positions[joint_name] = self.positions_deg[joint_name] + delta
+            target_positions[joint_name] = self.commanded_deg[joint_name] + delta
         
         if not target_positions:
             return MoveResult(False, "No valid joints for increment.", warnings, self.get_full_state())
         
-        result = self.set_joints_absolute(target_positions)
+        result = self._set_joints_absolute(target_positions)
         result.warnings.extend(warnings)
         return result
 
@@ -395,35 +923,75 @@ class RobotController:
     #execute
     def execute_interpolated(self,move_gripper_up_mm: Optional[float] = None,move_gripper_forward_mm: Optional[float] = None,
         tilt_gripper_down_angle: Optional[float] = None, rotate_gripper_clockwise_angle: Optional[float] = None,
-        rotate_robot_right_angle: Optional[float] = None,use_interpolation: bool = True) -> MoveResult:
+        rotate_robot_right_angle: Optional[float] = None,use_interpolation: bool = True, straight_line: bool = False) -> MoveResult:
+        return self._run_blocking(self._execute_interpolated, move_gripper_up_mm, move_gripper_forward_mm, tilt_gripper_down_angle,
+            rotate_gripper_clockwise_angle, rotate_robot_right_angle, use_interpolation, straight_line)
+
+    #same arguments as execute_interpolated, deltas are applied to the pose the arm holds when the move starts
+    def execute_interpolated_async(self,move_gripper_up_mm: Optional[float] = None,move_gripper_forward_mm: Optional[float] = None,
+        tilt_gripper_down_angle: Optional[float] = None, rotate_gripper_clockwise_angle: Optional[float] = None,
+        rotate_robot_right_angle: Optional[float] = None,use_interpolation: bool = True, straight_line: bool = False) -> MotionHandle:
+        return self.submit_motion(self._execute_interpolated, move_gripper_up_mm, move_gripper_forward_mm, tilt_gripper_down_angle,
+            rotate_gripper_clockwise_angle, rotate_robot_right_angle, use_interpolation, straight_line)
+
+    @traced("controller.execute_interpolated")
+    def _execute_interpolated(self,move_gripper_up_mm: Optional[float] = None,move_gripper_forward_mm: Optional[float] = None,
+        tilt_gripper_down_angle: Optional[float] = None, rotate_gripper_clockwise_angle: Optional[float] = None,
+        rotate_robot_right_angle: Optional[float] = None,use_interpolation: bool = True, straight_line: bool = False) -> MoveResult:
         
         if self.read_only:
             return MoveResult(False, "Cannot move robot in read-only mode", robot_state=self.get_full_state())
             
-        target_positions = self.positions_deg.copy()
+        try:
+            target_positions, target_xz = self.intuitive_move_target(
+                self.commanded_deg, move_gripper_up_mm, move_gripper_forward_mm, tilt_gripper_down_angle,
+                rotate_gripper_clockwise_angle, rotate_robot_right_angle)
+        except ValueError as e:
+            return MoveResult(False, str(e), robot_state=self.get_full_state())
+
+        # Straight line for the gripper instead of a straight line in joint space
+        plan = None
+        if straight_line and use_interpolation and target_xz is not None:
+            try:
+                plan = self.plan_cartesian_trajectory(target_positions, target_xz)
+            except ValueError as e:
+                return MoveResult(False, str(e), robot_state=self.get_full_state())
+        
+        return self._set_joints_absolute(target_positions, use_interpolation, plan=plan)
+
+    #target pose of an intuitive move starting at start_positions, target_xz is set when the gripper moves up / forward
+    #raises ValueError when the target is outside the workspace or has no IK solution
+    def intuitive_move_target(self, start_positions: Dict[str, float], move_gripper_up_mm: Optional[float] = None,
+        move_gripper_forward_mm: Optional[float] = None, tilt_gripper_down_angle: Optional[float] = None,
+        rotate_gripper_clockwise_angle: Optional[float] = None, rotate_robot_right_angle: Optional[float] = None
+        ) -> tuple[Dict[str, float], Optional[tuple[float, float]]]:
+
+        target_xz = None
+        target_positions = dict(start_positions)
         
         # Handle cartesian movements
         if move_gripper_up_mm is not None or move_gripper_forward_mm is not None:
-            target_x = self.cartesian_mm["x"] + (move_gripper_forward_mm or 0.0)
-            target_z = self.cartesian_mm["z"] + (move_gripper_up_mm or 0.0)
+            start_x, start_z = self.kinematics.forward_kin(start_positions["shoulder_lift"], start_positions["elbow_flex"])
+            target_x = start_x + (move_gripper_forward_mm or 0.0)
+            target_z = start_z + (move_gripper_up_mm or 0.0)
             
             # Validate target
             is_valid, msg = self.kinematics.is_valid_target_cart(target_x, target_z)
             if not is_valid:
-                return MoveResult(False, f"Invalid target: {msg}", robot_state=self.get_full_state())
+                raise ValueError(f"Invalid target: {msg}")
             
             try:
                 sl_target, ef_target = self.kinematics.inverse_kin(target_x, target_z)
-                target_positions["shoulder_lift"] = sl_target
-                target_positions["elbow_flex"] = ef_target
-                
-                # Wrist compensation
-                sl_change = sl_target - self.positions_deg["shoulder_lift"]
-                ef_change = ef_target - self.positions_deg["elbow_flex"]
-                target_positions["wrist_flex"] = self.positions_deg["wrist_flex"] - (sl_change - ef_change)
-                
             except Exception as e:
-                return MoveResult(False, f"Kinematics error: {e}", robot_state=self.get_full_state())
+                raise ValueError(f"Kinematics error: {e}") from e
+            target_positions["shoulder_lift"] = sl_target
+            target_positions["elbow_flex"] = ef_target
+            
+            # Wrist compensation
+            sl_change = sl_target - start_positions["shoulder_lift"]
+            ef_change = ef_target - start_positions["elbow_flex"]
+            target_positions["wrist_flex"] = start_positions["wrist_flex"] - (sl_change - ef_change)
+            target_xz = (target_x, target_z)
         
         # Handle direct joint movements
         if tilt_gripper_down_angle is not None:
@@ -432,12 +1000,18 @@ class RobotController:
             target_positions["wrist_roll"] += rotate_gripper_clockwise_angle
         if rotate_robot_right_angle is not None:
             target_positions["shoulder_pan"] += rotate_robot_right_angle
-        
-        return self.set_joints_absolute(target_positions, use_interpolation)
+
+        return target_positions, target_xz
     
     
     #use a preset position 
     def apply_named_preset(self, preset_key: str) -> MoveResult:
+        return self._run_blocking(self._apply_named_preset, preset_key)
+
+    def apply_named_preset_async(self, preset_key: str) -> MotionHandle:
+        return self.submit_motion(self._apply_named_preset, preset_key)
+
+    def _apply_named_preset(self, preset_key: str) -> MoveResult:
         if self.read_only:
             return MoveResult(False, "Cannot move robot in read-only mode", robot_state=self.get_full_state())
             
@@ -446,31 +1020,156 @@ class RobotController:
         
         preset_positions = self.presets[preset_key]
         logger.info(f"Applying preset '{preset_key}': {preset_positions}")
-        return self.set_joints_absolute(preset_positions)
+        return self._set_joints_absolute(preset_positions)
     
-    #takes a picture based when observing 
-    def get_camera_images(self) -> Dict[str, np.ndarray]:
+    #------------------------------motion scripts------------------------------
+
+    #run a parsed motion script (see motion_script.py) as one motion, every step is planned and validated before the
+    #first one moves; on_checkpoint(step_number, step) runs on the motion thread after each checkpoint step
+    def run_motion_script(self, steps: List[ScriptStep], on_checkpoint: Optional[Callable[[int, ScriptStep], None]] = None) -> MoveResult:
+        return self._run_blocking(self._run_motion_script, steps, on_checkpoint)
+
+    #target pose and trajectory of one step starting at start_positions, raises ValueError when it cannot be executed
+    def plan_script_step(self, step: ScriptStep, start_positions: Dict[str, float]) -> tuple[Dict[str, float], TrajectoryPlan]:
+        plan = None
+        if step.kind == "move":
+            move_params = {name: value for name, value in step.params.items() if name != "straight_line"}
+            target_positions, target_xz = self.intuitive_move_target(start_positions, **move_params)
+            if step.params.get("straight_line") and target_xz is not None:
+                plan = self.plan_cartesian_trajectory(target_positions, target_xz, start_positions)
+        elif step.kind == "gripper":
+            target_positions = {"gripper": step.params["openness_pct"]}
+        elif step.kind == "preset":
+            if step.params["name"] not in self.presets:
+                raise ValueError(f"Unknown preset: '{step.params['name']}'")
+            target_positions = {name: pos for name, pos in self.presets[step.params["name"]].items() if name in self.names_of_joint}
+        elif step.kind == "joints":
+            unknown = [name for name in step.params if name not in self.names_of_joint]
+            if unknown:
+                raise ValueError(f"Unknown joints {unknown}")
+            target_positions = dict(step.params)
+        else:
+            raise ValueError(f"Unknown step type '{step.kind}'")
+
+        is_valid, error_msg = self.check_if_valid_position(target_positions)
+        if not is_valid:
+            raise ValueError(error_msg)
+        if plan is None:
+            plan = self.plan_interpolated_trajectory(target_positions, start_positions)
+        return target_positions, plan
+
+    #plan every step from where the previous one ends, raises ValueError naming the first step that would fail
+    @traced("controller.validate_motion_script")
+    def validate_motion_script(self, steps: List[ScriptStep]) -> List[tuple[Dict[str, float], TrajectoryPlan]]:
+        pose = dict(self.commanded_deg)
+        planned = []
+        for number, step in enumerate(steps, start=1):
+            try:
+                target_positions, plan = self.plan_script_step(step, pose)
+            except ValueError as e:
+                raise ValueError(f"Step {number} ({step.describe()}): {e}") from e
+            pose.update(target_positions)
+            planned.append((target_positions, plan))
+        return planned
+
+    @traced("controller.run_motion_script")
+    def _run_motion_script(self, steps: List[ScriptStep], on_checkpoint: Optional[Callable[[int, ScriptStep], None]] = None) -> MoveResult:
+        if self.read_only:
+            return MoveResult(False, "Cannot move robot in read-only mode", robot_state=self.get_full_state())
+        if not self.robot:
+            return MoveResult(False, "Arm not connected", robot_state=self.get_full_state())
+
+        # planned on the motion thread, so the commanded pose cannot change between validation and execution
+        try:
+            planned = self.validate_motion_script(steps)
+        except ValueError as e:
+            return MoveResult(False, f"Script rejected before any motion. {e}", robot_state=self.get_full_state())
+
+        start = time.monotonic()
+        step_results: List[Dict[str, Any]] = []
+        warnings: List[str] = []
+        for number, (step, (target_positions, plan)) in enumerate(zip(steps, planned), start=1):
+            step_start = time.monotonic()
+            result = self._set_joints_absolute(target_positions, plan=plan)
+            entry: Dict[str, Any] = {"step": number, "action": step.describe(), "ok": result.ok,
+                                     "duration_s": round(time.monotonic() - step_start, 3)}
+            warnings.extend(result.warnings)
+            if not result.ok:
+                entry["message"] = result.msg
+                step_results.append(entry)
+                timing = {"script_duration_s": round(time.monotonic() - start, 3), "steps": step_results}
+                return MoveResult(False, f"Script stopped at step {number}/{len(steps)}: {result.msg}", warnings,
+                                  self.get_full_state(), timing)
+            step_results.append(entry)
+
+            if step.checkpoint and on_checkpoint is not None:
+                on_checkpoint(number, step)
+
+        timing = {"script_duration_s": round(time.monotonic() - start, 3), "steps": step_results}
+        return MoveResult(True, f"Script completed: {len(steps)} steps", warnings, self.get_full_state(), timing)
+
+    #start one capture thread per configured camera, each keeps its latest frame ready
+    def start_camera_capture(self) -> Dict[str, CameraCapture]:
+        with self._camera_lock:
+            if not self.camera_captures and self.robot is not None:
+                cameras = getattr(self.robot, "cameras", None) or {}
+                camera_names = list(robot_config.lerobot_config.get("cameras", {}).keys())
+                self.camera_captures = start_captures({name: cameras[name] for name in camera_names if name in cameras})
+            return self.camera_captures
+
+    def stop_camera_capture(self) -> None:
+        with self._camera_lock:
+            for capture in self.camera_captures.values():
+                capture.stop()
+            self.camera_captures = {}
+
+    #freshest frame per camera with its capture time
+    #newer_than (a time.monotonic() value) waits up to timeout seconds for frames captured after that moment
+    def get_camera_frames(self, newer_than: Optional[float] = None, timeout: Optional[float] = None) -> Dict[str, CameraFrame]:
+        if not self.robot:
+            return {}
+
+        captures = self.start_camera_capture()
+        capture_cfg = robot_config.CAMERA_CAPTURE
+        frames = {}
+        for camera_name, capture in captures.items():
+            if newer_than is not None:
+                frame = capture.wait_for_newer(newer_than, capture_cfg["WAIT_TIMEOUT_S"] if timeout is None else timeout)
+            else:
+                frame = capture.latest
+                if frame is None:
+                    # capture just started, wait for its first frame
+                    frame = capture.wait_for_newer(float("-inf"), capture_cfg["FIRST_FRAME_TIMEOUT_S"])
+            if frame is not None:
+                frames[camera_name] = frame
+        return frames
+
+    #takes a picture from every configured camera, returns the cached latest frames right away
+    #pass newer_than to wait for frames captured after a given time.monotonic() value
+    def get_camera_images(self, newer_than: Optional[float] = None, timeout: Optional[float] = None) -> Dict[str, np.ndarray]:
+        return {name: frame.image for name, frame in self.get_timestamped_images(newer_than, timeout).items()}
+
+    #same as get_camera_images, each image with the time.monotonic() it was captured at
+    @traced("controller.get_camera_images")
+    def get_timestamped_images(self, newer_than: Optional[float] = None, timeout: Optional[float] = None) -> Dict[str, CameraFrame]:
         if not self.robot:
             return {}
             
         try:
-            observation = self.robot.get_observation()
-            camera_images = {}
-            
-         
-            # SO100/SO101: direct camera names as numpy arrays
+            if getattr(self.robot, "cameras", None) is not None:
+                # SO100/SO101: served from the per-camera capture threads, the motors are not touched
+                return self.get_camera_frames(newer_than, timeout)
+
+            # robots without camera handles only expose frames through the full observation
             camera_names = list(robot_config.lerobot_config.get("cameras", {}).keys())
-            print('heloooooooooo')
-            print(camera_names)
             camera_images = {}
+            with self.bus_lock:
+                observation = self.robot.get_observation()
+            captured_at = time.monotonic()
             for key, value in observation.items():
                 camera_name = key.replace("observation.images.", "")
-                
                 if camera_name in camera_names and isinstance(value, np.ndarray) and value.ndim == 3:
-                    camera_images[camera_name] = value
-                
-                elif key in camera_names and isinstance(value, np.ndarray) and value.ndim == 3:
-                    camera_images[key] = value
+                    camera_images[camera_name] = CameraFrame(value, captured_at, 0)
             
             return camera_images
         except Exception as e:
@@ -483,11 +1182,22 @@ class RobotController:
             return
             
         logger.info("Disconnecting robot...")
+
+        self.stop_state_observer()
+        self.stop_camera_capture()
+
+        # Let the running move stop at its next step, then shut the motion thread down.
+        # The rest move runs on this thread so it still works from atexit handlers.
+        self.stop_motion(timeout=5.0)
+        if self._motion_thread is not None:
+            self._motion_queue.put(None)
+            self._motion_thread.join(timeout=1.0)
+            self._motion_thread = None
         
         # Don't move to rest position in read-only mode
         if reset_pos and not self.read_only:
             try:
-                result = self.apply_named_preset("1")
+                result = self._apply_named_preset("1")
                 if not result.ok:
                     logger.warning(f"Rest position failed: {result.msg}")
             except Exception as e:
@@ -0,0 +1,337 @@
+"""
+Camera frames to compact JPEGs for MCP responses: per-camera output profiles set the size, colour handling and quality
+Cameras are encoded concurrently on a shared thread pool, cv2 releases the GIL while resizing and encoding
+All views can instead be composed into one labeled mosaic, which is cheaper to encode and to send than separate frames
+Region-of-interest crops send the part of a frame that matters at camera resolution next to a small full-frame thumbnail
+"""
+
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# cv2 sampling factor values, older OpenCV builds without the flag always use 4:2:0
+CHROMA_SUBSAMPLING = {
+    "4:4:4": getattr(cv2, "IMWRITE_JPEG_SAMPLING_FACTOR_444", None),
+    "4:2:2": getattr(cv2, "IMWRITE_JPEG_SAMPLING_FACTOR_422", None),
+    "4:2:0": getattr(cv2, "IMWRITE_JPEG_SAMPLING_FACTOR_420", None),
+}
+
+
+#how one camera's frames are sent, sizes are upper bounds and frames are never upscaled
+@dataclass(frozen=True)
+class ImageProfile:
+    max_width: int = 768
+    max_height: int = 768
+    jpeg_quality: int = 80
+    grayscale: bool = False
+    input_color: str = "RGB"  # channel order the camera delivers, "RGB" or "BGR"
+    chroma_subsampling: str = "4:2:0"
+
+    @classmethod
+    def from_config(cls, cfg: Dict[str, Any]) -> "ImageProfile":
+        return cls(
+            max_width=int(cfg.get("MAX_WIDTH", cls.max_width)),
+            max_height=int(cfg.get("MAX_HEIGHT", cls.max_height)),
+            jpeg_quality=int(cfg.get("JPEG_QUALITY", cls.jpeg_quality)),
+            grayscale=bool(cfg.get("GRAYSCALE", cls.grayscale)),
+            input_color=str(cfg.get("INPUT_COLOR", cls.input_color)).upper(),
+            chroma_subsampling=str(cfg.get("CHROMA_SUBSAMPLING", cls.chroma_subsampling)),
+        )
+
+
+class ImagePipeline:
+
+    #profiles: {camera_name: config dict}, the "default" entry covers cameras without their own profile
+    #workers is the encode pool size, 0 uses one thread per core
+    def __init__(self, profiles: Dict[str, Dict[str, Any]], workers: int = 0) -> None:
+        default_cfg = profiles.get("default", {})
+        self.default = ImageProfile.from_config(default_cfg)
+        self.profiles = {name: ImageProfile.from_config({**default_cfg, **cfg}) for name, cfg in profiles.items() if name != "default"}
+        self.workers = workers or os.cpu_count() or 1
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        # resize / colour conversion scratch buffers, one set per worker thread so calls never share them
+        self._scratch = threading.local()
+
+    def profile_for(self, camera_name: Optional[str]) -> ImageProfile:
+        return self.profiles.get(camera_name, self.default)
+
+    #scratch array of this shape owned by the calling thread, reused by every later call with the same shape
+    def _buffer(self, slot: str, shape: Tuple[int, ...]) -> np.ndarray:
+        buffers = getattr(self._scratch, "buffers", None)
+        if buffers is None:
+            buffers = self._scratch.buffers = {}
+        key = (slot, shape)
+        buf = buffers.get(key)
+        if buf is None:
+            buf = buffers[key] = np.empty(shape, dtype=np.uint8)
+        return buf
+
+    #downscaling and colour conversion, the result is BGR (or single channel) uint8 ready for cv2.imencode
+    #the returned array is a scratch buffer of the calling thread, valid until its next call
+    def apply_profile(self, image: np.ndarray, profile: ImageProfile) -> np.ndarray:
+        # shrink first so the colour conversion touches as few pixels as possible
+        height, width = image.shape[:2]
+        scale = min(1.0, profile.max_width / width, profile.max_height / height)
+        if scale < 1.0:
+            size = (max(1, round(width * scale)), max(1, round(height * scale)))
+            # INTER_AREA averages the source pixels, no aliasing on large reductions
+            image = cv2.resize(image, size, dst=self._buffer("resize", (size[1], size[0]) + image.shape[2:]),
+                               interpolation=cv2.INTER_AREA)
+
+        if image.ndim == 3 and profile.grayscale:
+            code = cv2.COLOR_BGR2GRAY if profile.input_color == "BGR" else cv2.COLOR_RGB2GRAY
+            image = cv2.cvtColor(image, code, dst=self._buffer("color", image.shape[:2]))
+        elif image.ndim == 3 and profile.input_color == "RGB":
+            image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR, dst=self._buffer("color", image.shape))
+        return image
+
+    @staticmethod
+    def encode_jpeg(image: np.ndarray, profile: ImageProfile) -> bytes:
+        params = [cv2.IMWRITE_JPEG_QUALITY, profile.jpeg_quality]
+        sampling = CHROMA_SUBSAMPLING.get(profile.chroma_subsampling)
+        if sampling is not None and image.ndim == 3:
+            params += [cv2.IMWRITE_JPEG_SAMPLING_FACTOR, sampling]
+        ok, encoded = cv2.imencode(".jpg", image, params)
+        if not ok:
+            raise RuntimeError("JPEG encoding failed")
+        return encoded.tobytes()
+
+    #frame to JPEG bytes with an explicit profile (a thumbnail size, the mosaic settings)
+    def encode(self, image: np.ndarray, profile: ImageProfile) -> bytes:
+        return self.encode_jpeg(self.apply_profile(image, profile), profile)
+
+    #frame from camera_name to JPEG bytes following its profile
+    def process(self, image: np.ndarray, camera_name: Optional[str] = None) -> bytes:
+        return self.encode(image, self.profile_for(camera_name))
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="jpeg")
+            return self._pool
+
+    #encode concurrently {key: (frame, profile)} -> {key: JPEG bytes}, keeps the input order
+    def encode_many(self, jobs: Dict[Any, Tuple[np.ndarray, ImageProfile]]) -> Dict[Any, bytes]:
+        if len(jobs) <= 1 or self.workers <= 1:
+            return {key: self.encode(image, profile) for key, (image, profile) in jobs.items()}
+        futures = {key: self._executor().submit(self.encode, image, profile) for key, (image, profile) in jobs.items()}
+        return {key: future.result() for key, future in futures.items()}
+
+    def shutdown(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+
+#the part of a frame that matters, e.g. the gripper in the wrist camera, sent at camera resolution next to a small
+#thumbnail of the whole frame; box is (left, top, right, bottom) as fractions of the frame
+#applies in the listed distance zones (any zone when empty) while the gripper openness is within gripper_openness_pct
+@dataclass(frozen=True)
+class RegionOfInterest:
+    box: Tuple[float, float, float, float]
+    zones: Tuple[str, ...] = ()
+    gripper_openness_pct: Tuple[float, float] = (-math.inf, math.inf)
+    thumb_width: int = 384
+    crop_max_width: Optional[int] = None  # None: the camera's profile bounds the crop
+    crop_max_height: Optional[int] = None
+
+    @classmethod
+    def from_config(cls, cfg: Dict[str, Any]) -> "RegionOfInterest":
+        left, top, right, bottom = (float(v) for v in cfg["BOX"])
+        if not (0.0 <= left < right <= 1.0 and 0.0 <= top < bottom <= 1.0):
+            raise ValueError(f"ROI box {cfg['BOX']} is not (left, top, right, bottom) fractions of the frame")
+        low, high = cfg.get("GRIPPER_OPENNESS_PCT", (-math.inf, math.inf))
+        return cls(
+            box=(left, top, right, bottom),
+            zones=tuple(str(zone).lower() for zone in cfg.get("ZONES", ())),
+            gripper_openness_pct=(float(low), float(high)),
+            thumb_width=int(cfg.get("THUMB_WIDTH", cls.thumb_width)),
+            crop_max_width=int(cfg["CROP_MAX_WIDTH"]) if "CROP_MAX_WIDTH" in cfg else None,
+            crop_max_height=int(cfg["CROP_MAX_HEIGHT"]) if "CROP_MAX_HEIGHT" in cfg else None,
+        )
+
+    #zone None (not reported yet) only matches rules without zones, an unknown gripper openness matches any range
+    def applies(self, zone: Optional[str], gripper_openness_pct: Optional[float]) -> bool:
+        if self.zones and zone not in self.zones:
+            return False
+        if gripper_openness_pct is not None:
+            low, high = self.gripper_openness_pct
+            return low <= gripper_openness_pct <= high
+        return True
+
+    #view of the region inside image, nothing is copied
+    def crop(self, image: np.ndarray) -> np.ndarray:
+        height, width = image.shape[:2]
+        left, top, right, bottom = self.box
+        x0, y0 = int(left * width), int(top * height)
+        return image[y0:max(y0 + 1, int(bottom * height)), x0:max(x0 + 1, int(right * width))]
+
+    #the camera's profile limited to the thumbnail width
+    def thumbnail_profile(self, profile: ImageProfile) -> ImageProfile:
+        return replace(profile, max_width=min(profile.max_width, self.thumb_width))
+
+    #the camera's profile with the crop's own size limit, so the crop is not shrunk like a whole frame
+    def crop_profile(self, profile: ImageProfile) -> ImageProfile:
+        return replace(profile, max_width=self.crop_max_width or profile.max_width, max_height=self.crop_max_height or profile.max_height)
+
+
+#ROI rules per camera, {camera_name: [rule config, ...]} checked in order
+class RoiSelector:
+
+    def __init__(self, rules: Dict[str, List[Dict[str, Any]]]) -> None:
+        self.rules = {name: [RegionOfInterest.from_config(cfg) for cfg in cfgs] for name, cfgs in rules.items()}
+
+    #first rule of this camera that applies now, None when the frame is sent whole
+    def select(self, camera_name: str, zone: Optional[str], gripper_openness_pct: Optional[float]) -> Optional[RegionOfInterest]:
+        for roi in self.rules.get(camera_name, ()):
+            if roi.applies(zone, gripper_openness_pct):
+                return roi
+        return None
+
+
+#text in a black box at the top left corner of image, drawn in place
+def draw_label(image: np.ndarray, text: str, scale: float) -> None:
+    thickness = max(1, round(scale * 2))
+    pad = thickness * 2
+    (text_w, text_h), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, scale, thickness)
+    cv2.rectangle(image, (0, 0), (text_w + 2 * pad, text_h + baseline + 2 * pad), (0, 0, 0), cv2.FILLED)
+    cv2.putText(image, text, (pad, text_h + pad), cv2.FONT_HERSHEY_SIMPLEX, scale, (255, 255, 255), thickness, cv2.LINE_AA)
+
+
+#frames of one camera side by side in a grid (left to right, top to bottom), each with its label in the top left corner
+#every cell has the size of the first frame, the grid is as square as possible
+def tile_images(images: List[np.ndarray], labels: List[str]) -> np.ndarray:
+    height, width = images[0].shape[:2]
+    columns = math.ceil(math.sqrt(len(images)))
+    rows = math.ceil(len(images) / columns)
+    tiled = np.zeros((rows * height, columns * width) + images[0].shape[2:], dtype=np.uint8)
+
+    # text scaled to the cell so the label stays readable after the profile downscales the grid
+    scale = max(0.5, width / 640.0) * columns / 2.0
+    for index, (image, label) in enumerate(zip(images, labels)):
+        if image.shape[:2] != (height, width):
+            image = cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+        top, left = (index // columns) * height, (index % columns) * width
+        cell = tiled[top:top + height, left:left + width]
+        cell[...] = image
+        draw_label(cell, label, scale)
+    return tiled
+
+
+#downscale to size: INTER_AREA halvings (its fast integer-factor path) while the frame is over twice too large, then
+#one INTER_LINEAR step, which does not alias below a factor of two; several times faster than a single INTER_AREA resize
+def shrink(image: np.ndarray, size: Tuple[int, int]) -> np.ndarray:
+    width, height = size
+    while image.shape[1] >= 2 * width and image.shape[0] >= 2 * height:
+        image = cv2.resize(image, (image.shape[1] // 2, image.shape[0] // 2), interpolation=cv2.INTER_AREA)
+    if image.shape[1::-1] != (width, height):
+        image = cv2.resize(image, size, interpolation=cv2.INTER_LINEAR)
+    return image
+
+
+#all camera views in one labeled image, each scaled straight into its cell so a full frame is never copied
+#the grid comes from layouts ({camera count: (columns, rows)}, near-square for other counts) and the mosaic is shrunk
+#to the cells the frames actually fill, at most max_width x max_height; frames are never upscaled
+class CameraMosaic:
+
+    def __init__(self, max_width: int = 1024, max_height: int = 768, layouts: Optional[Dict[int, Tuple[int, int]]] = None) -> None:
+        self.max_width = max_width
+        self.max_height = max_height
+        self.layouts = layouts or {}
+
+    #(columns, rows) for this many cameras
+    def layout(self, count: int) -> Tuple[int, int]:
+        if count in self.layouts:
+            return self.layouts[count]
+        columns = math.ceil(math.sqrt(count))
+        return columns, math.ceil(count / columns)
+
+    #images {camera_name: frame} in camera order, timestamps {camera_name: time.monotonic() of the capture}
+    #each cell is labeled with the camera name and the wall clock time of its frame
+    def compose(self, images: Dict[str, np.ndarray], timestamps: Dict[str, float]) -> np.ndarray:
+        first = next(iter(images.values()))
+        columns, rows = self.layout(len(images))
+        # cells take the aspect ratio of the first frame, others are letterboxed into them
+        scale = min(1.0, self.max_width / (columns * first.shape[1]), self.max_height / (rows * first.shape[0]))
+        cell_w, cell_h = max(1, int(first.shape[1] * scale)), max(1, int(first.shape[0] * scale))
+        mosaic = np.zeros((rows * cell_h, columns * cell_w, 3), dtype=np.uint8)
+
+        label_scale = max(0.4, cell_h / 720.0)
+        clock_offset = time.time() - time.monotonic()
+        for index, (name, image) in enumerate(images.items()):
+            if index >= columns * rows:
+                break
+            if image.ndim == 2:
+                image = cv2.cvtColor(image, cv2.COLOR_GRAY2RGB)
+            fit = min(1.0, cell_w / image.shape[1], cell_h / image.shape[0])
+            size = (max(1, int(image.shape[1] * fit)), max(1, int(image.shape[0] * fit)))
+            top, left = (index // columns) * cell_h, (index % columns) * cell_w
+            cell = mosaic[top:top + cell_h, left:left + cell_w]
+            cell[:size[1], :size[0]] = shrink(image, size)
+
+            captured = timestamps.get(name)
+            stamp = ""
+            if captured is not None:
+                wall = captured + clock_offset
+                stamp = time.strftime("%H:%M:%S", time.localtime(wall)) + f".{int(wall * 1000) % 1000:03d}"
+            draw_label(cell, f"{name}  {stamp}".strip(), label_scale)
+        return mosaic
+
+
+#remembers a small grayscale thumbnail of the last frame sent per camera, so views that did not change can be skipped
+#a view changed when more than max_changed_fraction of the thumbnail pixels differ by more than pixel_threshold levels
+#thumbnails average whole blocks of the frame, so sensor noise cancels out while a moved object still shows up
+class FrameChangeDetector:
+
+    def __init__(self, thumb_width: int = 96, pixel_threshold: int = 12, max_changed_fraction: float = 0.001) -> None:
+        self.thumb_width = thumb_width
+        self.pixel_threshold = pixel_threshold
+        self.max_changed_fraction = max_changed_fraction
+        self._sent: Dict[str, Tuple[np.ndarray, str]] = {}  # camera_name -> (thumbnail, where it was sent)
+        self._lock = threading.Lock()
+
+    def thumbnail(self, image: np.ndarray) -> np.ndarray:
+        height, width = image.shape[:2]
+        size = (self.thumb_width, max(1, round(height * self.thumb_width / width)))
+        # shrink before the colour conversion, a full frame is never converted
+        thumb = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        if thumb.ndim == 3:
+            thumb = cv2.cvtColor(thumb, cv2.COLOR_RGB2GRAY)
+        return thumb
+
+    #where the image last sent for this camera is when the new frame looks the same, None when it changed
+    def unchanged_since(self, camera_name: str, thumb: np.ndarray) -> Optional[str]:
+        with self._lock:
+            sent = self._sent.get(camera_name)
+        if sent is None or sent[0].shape != thumb.shape:
+            return None
+        diff = thumb.astype(np.int16) - sent[0]
+        # ignore a global brightness shift (auto exposure), only local changes count
+        diff -= np.int16(np.median(diff))
+        changed = np.count_nonzero(np.abs(diff) > self.pixel_threshold) / diff.size
+        return sent[1] if changed <= self.max_changed_fraction else None
+
+    #remember a frame that is being sent, reference tells the client where to find it (e.g. "image 2 of response 5")
+    def record(self, camera_name: str, thumb: np.ndarray, reference: str) -> None:
+        with self._lock:
+            self._sent[camera_name] = (thumb, reference)
+
+    #remember frames of several cameras sent together as one image (a mosaic), they share its reference
+    def record_many(self, thumbs: Dict[str, np.ndarray], reference: str) -> None:
+        with self._lock:
+            for camera_name, thumb in thumbs.items():
+                self._sent[camera_name] = (thumb, reference)
+
+    #forget everything sent, the next frame of every camera is sent again
+    def reset(self) -> None:
+        with self._lock:
+            self._sent.clear()
@@ -0,0 +1,46 @@
+"""
+Inspection tours: every viewpoint configured for a target in INSPECTION_VIEWPOINTS visited in one motion script,
+in the order that takes the arm the least time, with camera images captured at each viewpoint
+"""
+
+from itertools import permutations
+from typing import Callable, Dict, List, Sequence
+
+from motion_script import ScriptStep
+
+# tours up to this many viewpoints are ordered exactly (n! candidate orders), longer ones nearest-neighbour first
+EXACT_ORDER_LIMIT = 7
+
+Pose = Dict[str, float]
+
+
+def _path_cost(cost: List[List[float]], order: Sequence[int]) -> float:
+    total, previous = 0.0, 0
+    for index in order:
+        total += cost[previous][index]
+        previous = index
+    return total
+
+
+#viewpoint names in the quickest visiting order from start, duration(a, b) is the time to move from pose a to pose b
+#the tour ends at its last viewpoint, there is no way back to the start
+def order_viewpoints(start: Pose, viewpoints: Dict[str, Pose], duration: Callable[[Pose, Pose], float]) -> List[str]:
+    names = list(viewpoints)
+    poses = [start] + [viewpoints[name] for name in names]
+    # cost[i][j] is the move from pose i to pose j, index 0 is where the arm is now
+    cost = [[duration(a, b) for b in poses] for a in poses]
+
+    if len(names) <= EXACT_ORDER_LIMIT:
+        order = min(permutations(range(1, len(poses))), key=lambda candidate: _path_cost(cost, candidate))
+    else:
+        order, previous, remaining = [], 0, set(range(1, len(poses)))
+        while remaining:
+            previous = min(remaining, key=lambda index: cost[previous][index])
+            remaining.remove(previous)
+            order.append(previous)
+    return [names[index - 1] for index in order]
+
+
+#motion script visiting the viewpoints in order, images are captured at every one of them
+def tour_steps(viewpoints: Dict[str, Pose], order: List[str]) -> List[ScriptStep]:
+    return [ScriptStep("joints", dict(viewpoints[name]), checkpoint=True, label=f"viewpoint '{name}'") for name in order]
@@ -0,0 +1,163 @@
+"""
+Continuous velocity jogging: held keys set axis velocities, a fixed-rate loop integrates them, solves IK every tick
+and streams the pose straight to the arm
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from controller_for_arm import RobotController
+
+logger = logging.getLogger(__name__)
+
+# cartesian axes move the wrist_flex origin in the arm plane, the rest are plain joint velocities
+CARTESIAN_AXES = ("forward", "up")
+JOINT_AXES = {"pan": "shoulder_pan", "tilt": "wrist_flex", "roll": "wrist_roll", "gripper": "gripper"}
+
+
+class JogLoop:
+
+    #speeds are the full speed of each axis: mm/s for forward/up, deg/s for pan/tilt/roll, %/s for the gripper
+    def __init__(self, robot: RobotController, rate_hz: float, speeds: Dict[str, float], ramp_time_s: float) -> None:
+        self.robot = robot
+        self.period = 1.0 / rate_hz
+        self.speeds = speeds
+        self.ramp_time_s = ramp_time_s
+        self._held: Dict[str, float] = {}  # axis -> direction (+1 / -1) of the keys currently down
+        self._held_lock = threading.Lock()
+        self.velocity = {axis: 0.0 for axis in speeds}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.blocked = ""  # why the last tick could not move, empty while moving freely
+
+        # joint axes stop at their limits instead of failing the whole tick, {joint: (deg_min, deg_max)}
+        converter = robot.converter
+        self.joint_limits = {}
+        for joint in JOINT_AXES.values():
+            cols = converter.columns([joint])
+            ends = converter.norm_to_deg(np.stack([converter.norm_lo[cols], converter.norm_hi[cols]]), cols)
+            self.joint_limits[joint] = (float(ends.min()), float(ends.max()))
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="jog", daemon=True)
+        self._thread.start()
+        logger.info(f"Jog loop started at {1.0 / self.period:.0f} Hz")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    #key down, repeated presses from OS key repeat are harmless
+    def press(self, axis: str, direction: float) -> None:
+        with self._held_lock:
+            self._held[axis] = direction
+
+    #key up, only releases the axis if it is still held in that direction
+    def release(self, axis: str, direction: float) -> None:
+        with self._held_lock:
+            if self._held.get(axis) == direction:
+                del self._held[axis]
+
+    def release_all(self) -> None:
+        with self._held_lock:
+            self._held.clear()
+
+    #ramp every axis velocity toward its held target, so starts and stops are smooth instead of a step
+    def update_velocity(self, dt: float) -> None:
+        with self._held_lock:
+            held = dict(self._held)
+        for axis, speed in self.speeds.items():
+            target = held.get(axis, 0.0) * speed
+            max_change = speed * dt / self.ramp_time_s if self.ramp_time_s > 0 else float("inf")
+            change = target - self.velocity[axis]
+            self.velocity[axis] += max(-max_change, min(max_change, change))
+
+    #next pose from the commanded pose and the current velocities, None when the arm should hold still
+    def next_pose(self, dt: float) -> Optional[Dict[str, float]]:
+        if not any(self.velocity.values()):
+            return None
+
+        kinematics = self.robot.kinematics
+        start = self.robot.commanded_deg
+        pose = dict(start)
+
+        dx = self.velocity.get("forward", 0.0) * dt
+        dz = self.velocity.get("up", 0.0) * dt
+        if dx or dz:
+            x, z = kinematics.forward_kin(start["shoulder_lift"], start["elbow_flex"])
+            target_x, target_z = x + dx, z + dz
+            is_valid, msg = kinematics.is_valid_target_cart(target_x, target_z)
+            if not is_valid:
+                # stop the cartesian part at the workspace edge, joint axes keep moving
+                self.blocked = msg
+                self.velocity["forward"] = self.velocity["up"] = 0.0
+                target_x, target_z = x, z
+            if (target_x, target_z) != (x, z):
+                shoulder_lift, elbow_flex = kinematics.inverse_kin(target_x, target_z)
+                pose["shoulder_lift"] = shoulder_lift
+                pose["elbow_flex"] = elbow_flex
+                # same wrist compensation as execute_interpolated, the gripper keeps its angle to the ground
+                pose["wrist_flex"] -= (shoulder_lift - start["shoulder_lift"]) - (elbow_flex - start["elbow_flex"])
+
+        for axis, joint in JOINT_AXES.items():
+            velocity = self.velocity.get(axis, 0.0)
+            if not velocity:
+                continue
+            lo, hi = self.joint_limits[joint]
+            # the margin keeps the clamped value inside the range after the round trip through normalized units
+            margin = 1e-6 * (hi - lo)
+            pose[joint] = min(hi - margin, max(lo + margin, pose[joint] + velocity * dt))
+            if pose[joint] == start[joint]:
+                self.velocity[axis] = 0.0
+        return pose
+
+    def tick(self, dt: float) -> None:
+        self.update_velocity(dt)
+        pose = self.next_pose(dt)
+        if pose is None:
+            return
+        ok, msg = self.robot.send_joint_positions(pose)
+        if ok:
+            self.blocked = ""
+            return
+
+        # a joint limit (or a planned move) is in the way: hold the pose and let the operator back out of it
+        if msg != self.blocked:
+            logger.warning(f"Jog blocked: {msg}")
+        self.blocked = msg
+        for axis in self.velocity:
+            self.velocity[axis] = 0.0
+
+    def _loop(self) -> None:
+        # tick i is due at start + i * period, like stream_trajectory
+        start = time.monotonic()
+        last = start
+        i = 0
+        while not self._stop.is_set():
+            i += 1
+            deadline = start + i * self.period
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                # fell behind by more than a tick, restart the schedule instead of bursting
+                start, i = time.monotonic(), 0
+
+            now = time.monotonic()
+            dt, last = now - last, now
+            try:
+                self.tick(dt)
+            except Exception as e:
+                logger.error(f"Jog tick failed: {e}", exc_info=True)
+                self.release_all()
+                for axis in self.velocity:
+                    self.velocity[axis] = 0.0
@@ -0,0 +1,100 @@
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+
+# Normalized range lerobot accepts for each motor. The gripper is a linear motor (0-100 with some slack),
+# every other joint is a position motor in the -100..100 range.
+GRIPPER_NORM_LIMITS: Tuple[float, float] = (-20.0, 100.0)
+JOINT_NORM_LIMITS: Tuple[float, float] = (-100.0, 100.0)
+
+
+class JointConverter:
+
+    #compile the motor mapping {name: (norm_min, norm_max, deg_min, deg_max)} into affine coefficient arrays
+    def __init__(self, motor_mapping: Dict[str, Tuple[float, float, float, float]]) -> None:
+        self.names: List[str] = list(motor_mapping.keys())
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.action_keys: List[str] = [f"{name}.pos" for name in self.names]
+
+        mapping = np.array([motor_mapping[name] for name in self.names], dtype=np.float64).reshape(-1, 4)
+        norm_min, norm_max, deg_min, deg_max = mapping.T
+        norm_span = norm_max - norm_min
+        deg_span = deg_max - deg_min
+
+        # degrees -> normalized: norm = deg * scale + offset (a flat degree range pins the value to norm_min)
+        deg_flat = deg_span == 0
+        self.d2n_scale = np.where(deg_flat, 0.0, norm_span / np.where(deg_flat, 1.0, deg_span))
+        self.d2n_offset = norm_min - self.d2n_scale * deg_min
+
+        # normalized -> degrees: deg = norm * scale + offset (a flat normalized range pins the value to deg_min)
+        norm_flat = norm_span == 0
+        self.n2d_scale = np.where(norm_flat, 0.0, deg_span / np.where(norm_flat, 1.0, norm_span))
+        self.n2d_offset = deg_min - self.n2d_scale * norm_min
+
+        # accepted normalized range per joint, already sorted so inverted mappings need no special casing
+        limits = np.array([GRIPPER_NORM_LIMITS if name == "gripper" else JOINT_NORM_LIMITS for name in self.names],
+                          dtype=np.float64).reshape(-1, 2)
+        self.norm_lo = limits.min(axis=1)
+        self.norm_hi = limits.max(axis=1)
+
+        # plain python copies for the scalar helpers, numpy scalars are slower than floats for single values
+        self.d2n: Dict[str, Tuple[float, float]] = {
+            name: (float(self.d2n_scale[i]), float(self.d2n_offset[i])) for i, name in enumerate(self.names)
+        }
+        self.n2d: Dict[str, Tuple[float, float]] = {
+            name: (float(self.n2d_scale[i]), float(self.n2d_offset[i])) for i, name in enumerate(self.names)
+        }
+
+    #column indices for an ordered list of joint names
+    def columns(self, names: Sequence[str]) -> np.ndarray:
+        return np.fromiter((self.index[name] for name in names), dtype=np.intp, count=len(names))
+
+    #degrees -> normalized for an array whose last axis follows cols (all joints when cols is None)
+    def deg_to_norm(self, degrees: Union[np.ndarray, Sequence[float]], cols: Optional[np.ndarray] = None) -> np.ndarray:
+        degrees = np.asarray(degrees, dtype=np.float64)
+        if cols is None:
+            return degrees * self.d2n_scale + self.d2n_offset
+        return degrees * self.d2n_scale[cols] + self.d2n_offset[cols]
+
+    #normalized -> degrees for an array whose last axis follows cols (all joints when cols is None)
+    def norm_to_deg(self, normalized: Union[np.ndarray, Sequence[float]], cols: Optional[np.ndarray] = None) -> np.ndarray:
+        normalized = np.asarray(normalized, dtype=np.float64)
+        if cols is None:
+            return normalized * self.n2d_scale + self.n2d_offset
+        return normalized * self.n2d_scale[cols] + self.n2d_offset[cols]
+
+    #boolean mask of the normalized values that fall outside the accepted range
+    def out_of_range(self, normalized: np.ndarray, cols: Optional[np.ndarray] = None) -> np.ndarray:
+        lo = self.norm_lo if cols is None else self.norm_lo[cols]
+        hi = self.norm_hi if cols is None else self.norm_hi[cols]
+        return (normalized < lo) | (normalized > hi)
+
+    #convert and range check a whole (steps x joints) trajectory in one go
+    #returns (normalized array, ok, error message, index of the first failing step or None)
+    def convert_and_validate(self, degrees: Union[np.ndarray, Sequence[float]], cols: Optional[np.ndarray] = None) -> Tuple[np.ndarray, bool, str, Optional[int]]:
+        degrees = np.asarray(degrees, dtype=np.float64)
+        normalized = self.deg_to_norm(degrees, cols)
+        bad = self.out_of_range(normalized, cols)
+        if not bad.any():
+            return normalized, True, "", None
+
+        # only format messages once something actually failed
+        bad_2d = bad.reshape(-1, bad.shape[-1])
+        first_step = int(np.argmax(bad_2d.any(axis=1)))
+        deg_row = degrees.reshape(-1, degrees.shape[-1])[first_step]
+        norm_row = normalized.reshape(-1, normalized.shape[-1])[first_step]
+        row_cols = np.arange(len(self.names)) if cols is None else cols
+
+        errors = []
+        for k in np.flatnonzero(bad_2d[first_step]):
+            i = row_cols[k]
+            jn = self.names[i]
+            errors.append(f"{jn.replace('_', ' ').title()} position {deg_row[k]:.1f}° "
+                          f"(normalized: {norm_row[k]:.1f}) is outside valid range "
+                          f"{self.norm_lo[i]:.1f} to {self.norm_hi[i]:.1f}")
+        return normalized, False, "Movement impossible - out of range: " + "; ".join(errors), first_step
+
+    #turn rows of normalized values into lerobot action dicts
+    def to_actions(self, normalized: np.ndarray, cols: Optional[np.ndarray] = None) -> List[Dict[str, float]]:
+        keys = self.action_keys if cols is None else [self.action_keys[i] for i in cols]
+        return [dict(zip(keys, row)) for row in np.atleast_2d(normalized).tolist()]
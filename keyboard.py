@@ -5,12 +5,17 @@ Keyboard controller for intuitive robot control.
 
 import sys
 import time
+import argparse
 import os
 import logging
+import threading
 from datetime import datetime
 from typing import Dict, Any
 from pynput import keyboard
 from controller_for_arm import RobotController
+from config_robot import robot_config
+from jog import JogLoop
+from teleop_queue import TeleopBatch, TeleopCommandQueue
 from PIL import Image
 
 # Configure logging
@@ -20,7 +25,7 @@ logger = logging.getLogger(__name__)
 #created this class to control arm with keyboard inputs
 class KeyboardController:
    #initalizing object state
-    def __init__(self, robot_controller: RobotController):
+    def __init__(self, robot_controller: RobotController, jog: bool = False):
         self.robot = robot_controller
         self.running = False
         
@@ -28,6 +33,21 @@ class KeyboardController:
         self.angle_step_deg = 2.0
         self.gripper_step_pct = 3.0
         
+        # key presses are merged here and applied by the control thread, so the listener never waits on the bus
+        # with key repeat at most max_pending_steps steps of motion can be waiting when a key is released
+        self.max_pending_steps = 5
+        spatial_cap = self.max_pending_steps * self.spatial_step_mm
+        angle_cap = self.max_pending_steps * self.angle_step_deg
+        self.commands = TeleopCommandQueue({
+            "move_gripper_forward_mm": spatial_cap,
+            "move_gripper_up_mm": spatial_cap,
+            "rotate_robot_right_angle": angle_cap,
+            "tilt_gripper_down_angle": angle_cap,
+            "rotate_gripper_clockwise_angle": angle_cap,
+            "gripper": self.max_pending_steps * self.gripper_step_pct,
+        })
+        self.control_thread = None
+        
         # Create a directory if it doesn't exist
         self.snapshots_dir = "camera_snapshots"
         os.makedirs(self.snapshots_dir, exist_ok=True)
@@ -70,47 +90,108 @@ class KeyboardController:
         self.key_mappings[keyboard.KeyCode.from_char('2')] = ("preset", "2")
         self.key_mappings[keyboard.KeyCode.from_char('3')] =  ("preset", "3")
         self.key_mappings[keyboard.KeyCode.from_char('4')] = ("preset", "4")
+
+        # Jog mode: movement keys drive an axis velocity while held, {key: (axis, direction)}
+        self.jog_mappings = {
+            keyboard.KeyCode.from_char('w'): ("forward", 1.0),
+            keyboard.KeyCode.from_char('s'): ("forward", -1.0),
+            keyboard.Key.up: ("up", 1.0),
+            keyboard.Key.down: ("up", -1.0),
+            keyboard.Key.left: ("pan", -1.0),
+            keyboard.Key.right: ("pan", 1.0),
+            keyboard.KeyCode.from_char('r'): ("tilt", -1.0),
+            keyboard.KeyCode.from_char('f'): ("tilt", 1.0),
+            keyboard.KeyCode.from_char('a'): ("roll", -1.0),
+            keyboard.KeyCode.from_char('d'): ("roll", 1.0),
+            keyboard.KeyCode.from_char('q'): ("gripper", 1.0),
+            keyboard.KeyCode.from_char('e'): ("gripper", -1.0),
+        }
+        self.jog = None
+        if jog:
+            jog_config = robot_config.JOG
+            linear, angular = jog_config["LINEAR_MM_S"], jog_config["ANGULAR_DEG_S"]
+            self.jog = JogLoop(self.robot, jog_config["RATE_HZ"],
+                               {"forward": linear, "up": linear, "pan": angular, "tilt": angular, "roll": angular,
+                                "gripper": jog_config["GRIPPER_PCT_S"]},
+                               jog_config["RAMP_TIME_S"])
     
     
-    #handles the events of when a key is pressed    
+    #handles the events of when a key is pressed, only queues the command
     def on_press(self, key: Any) -> bool:
         
         if key == keyboard.Key.esc:
             self.stop()
             return False  # Stop listener
 
+        if self.jog is not None and key in self.jog_mappings:
+            self.jog.press(*self.jog_mappings[key])
+            return True
+
         if key in self.key_mappings:
             action_type, params = self.key_mappings[key]
             
+            if action_type == "intuitive_move":
+                self.commands.push_move(params)
+            elif action_type == "gripper_delta":
+                self.commands.push_gripper(params)
+            elif action_type == "preset":
+                self.commands.push_preset(params)
+            elif action_type == "camera_snapshot":
+                self.commands.push_snapshot()
+                
+        return True
+
+    #handles the events of when a key is released, only used to stop jogging
+    def on_release(self, key: Any) -> bool:
+        if self.jog is not None and key in self.jog_mappings:
+            self.jog.release(*self.jog_mappings[key])
+        return True
+
+    #control thread, applies everything queued since the last move as one command
+    def control_loop(self) -> None:
+        while not self.commands.closed:
+            batch = self.commands.take(timeout=0.5)
+            if batch is None:
+                continue
             try:
-                if action_type == "intuitive_move":
-                    result = self.robot.execute_interpolated(**params, use_interpolation=False)
-                    if not result.ok:
-                        print(f"Movement error: {result.msg}")
-                        
-                elif action_type == "gripper_delta":
-                    delta = params
-                    result = self.robot.increment_joints_by_delta({'gripper': delta})
-                    if not result.ok:
-                        print(f"Gripper error: {result.msg}")
-                        
-                elif action_type == "preset":
-                    preset_key = params
-                    result = self.robot.apply_named_preset(preset_key)
-                    if result.ok:
-                        print(f"Applied preset {preset_key}")
-                    else:
-                        print(f"Preset error: {result.msg}")
-                        
-                elif action_type == "camera_snapshot":
-                    self.take_camera_snapshot()
-                    
+                self.apply_batch(batch)
             except Exception as e:
                 logger.error(f"Error executing command: {e}", exc_info=True)
-                
+
+    def apply_batch(self, batch: TeleopBatch) -> None:
+        if batch.preset is not None:
+            result = self.robot.apply_named_preset(batch.preset)
+            if result.ok:
+                print(f"Applied preset {batch.preset}")
+            else:
+                print(f"Preset error: {result.msg}")
+
+        move_params = {name: delta for name, delta in batch.move_deltas.items() if delta != 0.0}
+        if move_params:
+            # a single key step is sent as one pose like before, merged presses are interpolated instead of jumping
+            result = self.robot.execute_interpolated(**move_params, use_interpolation=not self.is_single_step(move_params))
+            if not result.ok:
+                print(f"Movement error: {result.msg}")
+
+        if batch.gripper_delta != 0.0:
+            result = self.robot.increment_joints_by_delta({'gripper': batch.gripper_delta})
+            if not result.ok:
+                print(f"Gripper error: {result.msg}")
+
+        if batch.snapshot:
+            self.take_camera_snapshot()
+
+        if batch.commands > 1:
+            logger.debug(f"Merged {batch.commands} key presses, {(time.monotonic() - batch.first_enqueued) * 1000:.0f} ms from first press to done")
+
+    #true when no delta is larger than what one key press moves
+    def is_single_step(self, move_params: Dict[str, float]) -> bool:
+        for name, delta in move_params.items():
+            step = self.spatial_step_mm if name.endswith("_mm") else self.angle_step_deg
+            if abs(delta) > step + 1e-9:
+                return False
         return True
 
-    
     def take_camera_snapshot(self) -> None:
         try:
             images = self.robot.get_camera_images()
@@ -145,17 +226,25 @@ class KeyboardController:
         print("\n" + "="*50)
         print("🎮 KEYBOARD CONTROLLER ACTIVE")
         print("="*50)
+        if self.jog is not None:
+            spatial = f"{self.jog.speeds['forward']} mm/s while held"
+            angle = f"{self.jog.speeds['pan']}°/s while held"
+            gripper = f"{self.jog.speeds['gripper']}%/s while held"
+        else:
+            spatial = f"{self.spatial_step_mm} mm"
+            angle = f"{self.angle_step_deg}°"
+            gripper = f"{self.gripper_step_pct}%"
         print("📍 CARTESIAN MOVEMENT:")
-        print(f"   W/S: Gripper Forward/Backward ({self.spatial_step_mm} mm)")
-        print(f"   ↑/↓: Gripper Up/Down ({self.spatial_step_mm} mm)")
+        print(f"   W/S: Gripper Forward/Backward ({spatial})")
+        print(f"   ↑/↓: Gripper Up/Down ({spatial})")
         print()
         print("🔄 ROTATIONS:")
-        print(f"   ←/→: Rotate Robot CCW/CW ({self.angle_step_deg}°)")
-        print(f"   R/F: Tilt Gripper Up/Down ({self.angle_step_deg}°)")
-        print(f"   A/D: Rotate Gripper CCW/CW ({self.angle_step_deg}°)")
+        print(f"   ←/→: Rotate Robot CCW/CW ({angle})")
+        print(f"   R/F: Tilt Gripper Up/Down ({angle})")
+        print(f"   A/D: Rotate Gripper CCW/CW ({angle})")
         print()
         print("🤏 GRIPPER:")
-        print(f"   Q/E: Open/Close ({self.gripper_step_pct}%)")
+        print(f"   Q/E: Open/Close ({gripper})")
         print()
         print("📸 CAMERA & PRESETS:")
         print("   C: Camera Snapshot")
@@ -165,13 +254,20 @@ class KeyboardController:
         print("="*50)
         
         self.running = True
+        self.control_thread = threading.Thread(target=self.control_loop, name="teleop-control", daemon=True)
+        self.control_thread.start()
+        if self.jog is not None:
+            self.jog.start()
         try:
-            self.listener = keyboard.Listener(on_press=self.on_press)
+            self.listener = keyboard.Listener(on_press=self.on_press, on_release=self.on_release)
             self.listener.start()
             print("✅ Keyboard controller started. Press keys to control robot.")
         except Exception as e:
             logger.error(f"Failed to start keyboard listener: {e}", exc_info=True)
             self.running = False
+            self.commands.close()
+            if self.jog is not None:
+                self.jog.stop()
 
     #stop keyboard controller
     def stop(self) -> None:
@@ -183,6 +279,13 @@ class KeyboardController:
                     self.listener.stop()
                 except Exception as e:
                     logger.error(f"Error stopping listener: {e}")
+            if self.jog is not None:
+                self.jog.stop()
+            # anything still queued is dropped, the move in progress finishes before the thread exits
+            self.commands.clear()
+            self.commands.close()
+            if self.control_thread is not None and self.control_thread is not threading.current_thread():
+                self.control_thread.join(timeout=5.0)
 
     #makes sure it exists completely 
     def wait_for_exit(self) -> None:
@@ -194,6 +297,10 @@ class KeyboardController:
                 
                 
 def main():
+    parser = argparse.ArgumentParser(description="Keyboard control for the SO-101 arm")
+    parser.add_argument("--jog", action="store_true", help="move continuously while a key is held instead of fixed steps per press")
+    args = parser.parse_args()
+
     #executes all with error handling 
     print("🚀 Starting Keyboard Controller...")
     
@@ -207,7 +314,7 @@ def main():
         print("✅ Robot connected successfully")
         
         # Initialize keyboard controller
-        kb_controller = KeyboardController(robot_instance)
+        kb_controller = KeyboardController(robot_instance, jog=args.jog)
         kb_controller.start()
         
         # Keep main thread alive while keyboard listener runs
@@ -10,6 +10,8 @@ from dataclasses import dataclass
 from typing import Dict, List, Any, Optional, Callable
 from functools import wraps
 
+from tracing import span, traced
+
 
 @dataclass
 class LLMResponse:
@@ -133,6 +135,7 @@ class LLMProvider(ABC):
         """Format messages for the provider's API."""
         pass
     
+    @traced("llm.generate_response")
     @retry_llm_call(max_retries=5, initial_delay=1.0)
     async def generate_response(
         self,
@@ -144,14 +147,16 @@ class LLMProvider(ABC):
         max_tokens: int = 4096
     ) -> LLMResponse:
         """Generate a response from the LLM with automatic retry logic."""
-        return await self._generate_response_impl(
-            messages=messages,
-            tools=tools,
-            temperature=temperature,
-            thinking_enabled=thinking_enabled,
-            thinking_budget=thinking_budget,
-            max_tokens=max_tokens
-        )
+        # one span per attempt, the outer llm.generate_response span includes the retry delays
+        with span("llm.request", provider=self.provider_name, model=self.model):
+            return await self._generate_response_impl(
+                messages=messages,
+                tools=tools,
+                temperature=temperature,
+                thinking_enabled=thinking_enabled,
+                thinking_budget=thinking_budget,
+                max_tokens=max_tokens
+            )
     
     @abstractmethod
     async def _generate_response_impl(
@@ -0,0 +1,152 @@
+"""
+Asynchronous logging for the controller and MCP server: callers only enqueue records, a background listener formats
+and writes them; payloads are serialized lazily and high-frequency events are rate limited and sampled
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from typing import Any, Dict, Optional
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_handler: Optional[logging.Handler] = None
+_setup_lock = threading.Lock()
+
+
+#json.dumps deferred until the record is actually written, the top level is copied so later edits by the caller
+#do not leak into the log line; nested values must not be mutated after logging
+class LazyJson:
+    __slots__ = ("payload",)
+
+    def __init__(self, payload: Any) -> None:
+        self.payload = dict(payload) if isinstance(payload, dict) else payload
+
+    def __str__(self) -> str:
+        return json.dumps(self.payload, default=str)
+
+
+#per-event rate limit and 1-in-N sampling, records carry the event name in extra={"event": ...}
+#limits: {event: {"RATE_PER_S": max records per second, "SAMPLE_EVERY": keep one record in N}}
+class EventSampler(logging.Filter):
+
+    def __init__(self, limits: Dict[str, Dict[str, float]]) -> None:
+        super().__init__()
+        self.limits = limits
+        self._state: Dict[str, list] = {}  # event -> [tokens, last refill, seen count, dropped count]
+        self._lock = threading.Lock()
+
+    #true when a record for this event should be emitted, events without limits always pass
+    def allow(self, event: str) -> bool:
+        limit = self.limits.get(event)
+        if limit is None:
+            return True
+
+        with self._lock:
+            state = self._state.get(event)
+            now = time.monotonic()
+            if state is None:
+                rate = limit.get("RATE_PER_S")
+                state = self._state[event] = [rate if rate else 0.0, now, 0, 0]
+
+            state[2] += 1
+            sample_every = int(limit.get("SAMPLE_EVERY", 1))
+            if sample_every > 1 and (state[2] - 1) % sample_every:
+                state[3] += 1
+                return False
+
+            rate = limit.get("RATE_PER_S")
+            if rate:
+                # token bucket holding at most one second of records
+                state[0] = min(rate, state[0] + (now - state[1]) * rate)
+                state[1] = now
+                if state[0] < 1.0:
+                    state[3] += 1
+                    return False
+                state[0] -= 1.0
+            return True
+
+    #records dropped so far per event
+    def dropped(self) -> Dict[str, int]:
+        with self._lock:
+            return {event: state[3] for event, state in self._state.items()}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        event = getattr(record, "event", None)
+        return event is None or self.allow(event)
+
+
+#enqueue without formatting, the message (and any LazyJson argument) is rendered on the listener thread
+#a full queue drops the record instead of blocking the caller
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # tracebacks reference live frames, render them now and ship plain text
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+sampler = EventSampler({})
+
+
+#install the queue handler on the root logger once, later calls only update the event limits
+def configure_logging(fmt: str, level: int = logging.INFO, queue_size: int = 10000,
+                      event_limits: Optional[Dict[str, Dict[str, float]]] = None) -> None:
+    global _listener, _handler
+    with _setup_lock:
+        if event_limits:
+            sampler.limits.update(event_limits)
+        if _listener is not None:
+            return
+
+        stream = logging.StreamHandler()
+        stream.setFormatter(logging.Formatter(fmt))
+        log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        handler = DeferredQueueHandler(log_queue)
+        handler.addFilter(sampler)
+
+        root = logging.getLogger()
+        root.setLevel(level)
+        root.addHandler(handler)
+        _handler = handler
+        _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+#flush everything still queued and stop the writer thread, later records are written synchronously
+def shutdown_logging() -> None:
+    global _listener, _handler
+    with _setup_lock:
+        if _listener is None:
+            return
+        root = logging.getLogger()
+        root.removeHandler(_handler)
+        _listener.stop()
+        for target in _listener.handlers:
+            root.addHandler(target)
+        _listener = None
+        _handler = None
+
+
+#log a high-frequency event, costs one level check when the level is disabled and one sampler check when limited
+def log_event(logger: logging.Logger, level: int, event: str, msg: str, *args: Any) -> None:
+    if logger.isEnabledFor(level) and sampler.allow(event):
+        # already sampled here, the handler filter must not count it a second time
+        logger.log(level, msg, *args, extra={"event": None})
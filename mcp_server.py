@@ -4,13 +4,11 @@ MCP server that host interactive functions to the arm
 
 from __future__ import annotations
 
-import time
-import io
 import logging
+import threading
 from typing import List, Optional, Union
 
 import numpy as np
-from PIL import Image as PILImage
 
 from typing import Dict, Tuple,Any, Final
 from dataclasses import dataclass, field
@@ -19,13 +17,19 @@ from mcp.server.fastmcp import FastMCP, Image
 
 from controller_for_arm import RobotController
 from config_robot import robot_config
+from log_pipeline import configure_logging, log_event
+import tracing
+from camera_capture import CameraFrame
+from image_pipeline import CameraMosaic, FrameChangeDetector, ImageProfile, ImagePipeline, RoiSelector, tile_images
+from inspection_tour import order_viewpoints, tour_steps
+from motion_script import ScriptStep, as_bool, parse_script
+from tracing import span, traced
 
 import atexit
-import traceback
-import time
 
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s MCP_Server %(levelname)s: %(message)s")
+configure_logging("%(asctime)s MCP_Server %(levelname)s: %(message)s", level=getattr(logging, robot_config.LOGGING["LEVEL"]),
+                  queue_size=robot_config.LOGGING["QUEUE_SIZE"], event_limits=robot_config.LOGGING["EVENTS"])
 logger = logging.getLogger(__name__) # Use a named logger for MCP server specifics if any
 
 #-----------------------------------------Initialise FastMCP server-------------------------------------
@@ -42,14 +46,60 @@ mcp = FastMCP(
 
 _robot: Optional[RobotController] = None
 
- #Convert a numpy RGB image to MCP image format
-def _np_to_mcp_image(arr_rgb: np.ndarray) -> Image:
-   
-    pil_img = PILImage.fromarray(arr_rgb)
-    with io.BytesIO() as buf:
-        pil_img.save(buf, format="JPEG")
-        raw_data = buf.getvalue()
-    return Image(data=raw_data, format="jpeg")
+ #downscaling, colour handling and JPEG quality per camera, see CAMERA_OUTPUT_PROFILES
+_image_pipeline = ImagePipeline(robot_config.CAMERA_OUTPUT_PROFILES, robot_config.IMAGE_ENCODER_WORKERS)
+#last image sent per camera in this session, unchanged views are answered with text instead of a new image
+_change_cfg = robot_config.FRAME_CHANGE_DETECTION
+_frame_changes = FrameChangeDetector(_change_cfg["THUMB_WIDTH"], _change_cfg["PIXEL_THRESHOLD"],
+                                     _change_cfg["MAX_CHANGED_FRACTION"]) if _change_cfg["ENABLED"] else None
+#all cameras as one labeled image instead of one image each, see CAMERA_MOSAIC
+_mosaic_cfg = robot_config.CAMERA_MOSAIC
+_mosaic = CameraMosaic(_mosaic_cfg["MAX_WIDTH"], _mosaic_cfg["MAX_HEIGHT"],
+                       {int(count): tuple(grid) for count, grid in _mosaic_cfg["LAYOUTS"].items()}) if _mosaic_cfg["ENABLED"] else None
+_mosaic_profile = ImageProfile(max_width=_mosaic_cfg["MAX_WIDTH"], max_height=_mosaic_cfg["MAX_HEIGHT"],
+                               jpeg_quality=_mosaic_cfg["JPEG_QUALITY"])
+#cameras with a matching CAMERA_ROI rule are sent as a full-frame thumbnail plus a crop at camera resolution
+_roi_selector = RoiSelector(robot_config.CAMERA_ROI)
+DISTANCE_ZONES = ("far", "medium", "near", "grasp")
+#distance zone to the target as last reported by the model with move_robot, None until it reports one
+_distance_zone: Optional[str] = None
+#tool responses built in this session, numbered so that a later response can point back at one of their images
+_response_count = 0
+_response_lock = threading.Lock()
+
+
+#parts of one tool response after its result json; clients label the images of a tool result "Image 1", "Image 2", ...
+#in the order they appear, so every image added here knows its own number
+class ToolResponse:
+
+    def __init__(self, number: int) -> None:
+        self.number = number
+        self.parts: List[Union[Image, str]] = []
+        self.image_count = 0
+
+    def add_text(self, text: str) -> None:
+        self.parts.append(text)
+
+    #returns the number the client gives the image
+    def add_image(self, image: Image) -> int:
+        self.parts.append(image)
+        self.image_count += 1
+        return self.image_count
+
+    #how a later response refers to one of these images
+    def reference(self, index: int) -> str:
+        return f"image {index} of response {self.number}"
+
+
+def _new_response() -> ToolResponse:
+    global _response_count
+    with _response_lock:
+        _response_count += 1
+        return ToolResponse(_response_count)
+
+ #Convert a numpy RGB image to MCP image format using the camera's output profile
+def _np_to_mcp_image(arr_rgb: np.ndarray, camera_name: Optional[str] = None) -> Image:
+    return Image(data=_image_pipeline.process(arr_rgb, camera_name), format="jpeg")
 
 
 #     Lazy-initialise the global RobotController instance.
@@ -64,6 +114,8 @@ def get_robot() -> RobotController:
         try:
             _robot = RobotController()
             logger.info(f"RobotController initialized.")
+            if robot_config.STATE_OBSERVER["ENABLED"]:
+                _robot.start_state_observer()
 
         except Exception as e:
             logger.error(f"MCP: FATAL - Error initializing robot: {e}", exc_info=True)
@@ -79,34 +131,121 @@ def get_robot() -> RobotController:
 
     # Args:
     #     result_json: The operation result in JSON format
-    #     is_movement: If True, adds a small delay before capturing images to ensure they're current
+    #     is_movement: If True, waits until the arm has settled and uses camera frames captured after that
     
 
-def get_state_with_images(result_json: dict, is_movement: bool = False) -> List[Union[Image, dict, list]]:
+def get_state_with_images(result_json: dict, is_movement: bool = False, response: Optional[ToolResponse] = None) -> List[Union[Image, dict, list]]:
     robot = get_robot()
+    # a caller that already added images (e.g. checkpoints of a motion script) passes its response to append to
+    if response is None:
+        response = _new_response()
+    result_json["response_number"] = response.number
     try:
-        if is_movement:
-            time.sleep(1.0)  # wait until the robot moved before capturing images
-        
-        raw_imgs = robot.get_camera_images()
+        frames = _capture_frames(robot, is_movement, result_json)
         
         #adding another check to make sure images are being fed or not
-        if not raw_imgs:
+        if not frames:
             logger.warning("MCP: No camera images returned from robot controller.")
-            return [result_json, "Warning: No camera images available."]
+            response.add_text("Warning: No camera images available.")
+            return [result_json] + response.parts
         
-        mcp_images = [_np_to_mcp_image(img) for img in raw_imgs.values()]
+        camera_images = _image_parts(frames, response)
+        if camera_images:
+            result_json["camera_images"] = camera_images
             
         # Keep only human_readable_state inside robot_state for clients
         result_json["robot_state"] = result_json["robot_state"]["human_readable_state"]
 
         # Return combined response
-        return [result_json] + mcp_images
+        return [result_json] + response.parts
     except Exception as e:
-        logger.error(f"Error getting camera images: {str(e)}")
-        logger.error(traceback.format_exc())
+        logger.error("Error getting camera images: %s", e, exc_info=True)
         # If camera access fails, still return state with empty image list
-        return [result_json] + ["Error getting camera images"]
+        return [result_json] + response.parts + ["Error getting camera images"]
+
+
+#one frame per camera, after a move waits until the arm settled and uses frames captured after that
+#a warning is added to result_json when the arm did not settle in time or stopped away from its commanded pose
+def _capture_frames(robot: RobotController, is_movement: bool, result_json: dict) -> Dict[str, CameraFrame]:
+    newer_than = None
+    if is_movement:
+        # wait until the arm actually stopped, then use frames captured after that
+        with span("mcp.settle_wait"):
+            settle = robot.wait_until_settled()
+        newer_than = settle["settled_at"]
+        if not settle["settled"]:
+            result_json.setdefault("warnings", []).append(
+                f"Arm had not settled after {settle['settle_time_s']} s, images may show it still moving")
+        elif settle["off_target_deg"]:
+            result_json.setdefault("warnings", []).append(
+                f"Arm stopped off its commanded pose (error in degrees): {settle['off_target_deg']}")
+
+    with span("mcp.camera_capture"):
+        return robot.get_timestamped_images(newer_than=newer_than)
+
+
+#encode the views that changed since they were last sent and add them to response, unchanged ones become a short text
+#part; returns {camera_name: "image N" in this response (and the crop's image number) or "unchanged since image N of response M"}
+#with the mosaic enabled every view goes into one image as soon as any of them changed
+#a camera with an active region of interest is sent as a full-frame thumbnail followed by the crop
+def _image_parts(frames: Dict[str, CameraFrame], response: ToolResponse) -> Dict[str, str]:
+    raw_imgs = {name: frame.image for name, frame in frames.items()}
+    unchanged: Dict[str, str] = {}
+    thumbs: Dict[str, np.ndarray] = {}
+    if _frame_changes is not None:
+        with span("mcp.change_detection"):
+            for name, img in raw_imgs.items():
+                thumbs[name] = _frame_changes.thumbnail(img)
+                previous = _frame_changes.unchanged_since(name, thumbs[name])
+                if previous is not None:
+                    unchanged[name] = previous
+    changed_imgs = {name: img for name, img in raw_imgs.items() if name not in unchanged}
+    camera_images: Dict[str, str] = {}
+
+    # the mosaic already shows every whole frame, only the crops are added to it
+    robot = get_robot()
+    rois = {name: roi for name in changed_imgs
+            if (roi := _roi_selector.select(name, _distance_zone, robot.commanded_deg.get("gripper"))) is not None}
+    jobs: Dict[Tuple[str, str], Tuple[np.ndarray, ImageProfile]] = {}
+    for name, img in changed_imgs.items():
+        profile = _image_pipeline.profile_for(name)
+        if name in rois:
+            jobs[(name, "roi")] = (rois[name].crop(img), rois[name].crop_profile(profile))
+            if _mosaic is None:
+                jobs[(name, "full")] = (img, rois[name].thumbnail_profile(profile))
+        elif _mosaic is None:
+            jobs[(name, "full")] = (img, profile)
+
+    if _mosaic is not None and changed_imgs:
+        with span("mcp.mosaic", images=len(raw_imgs)):
+            mosaic = _mosaic.compose(raw_imgs, {name: frame.timestamp for name, frame in frames.items()})
+        jobs[("mosaic", "full")] = (mosaic, _mosaic_profile)
+
+    with span("mcp.jpeg_encode", images=len(jobs)):
+        # all images at once on the encoder pool
+        jpegs = _image_pipeline.encode_many(jobs)
+
+    if _mosaic is not None and changed_imgs:
+        index = response.add_image(Image(data=jpegs[("mosaic", "full")], format="jpeg"))
+        camera_images = {name: f"image {index} (mosaic)" for name in raw_imgs}
+        if _frame_changes is not None:
+            _frame_changes.record_many(thumbs, response.reference(index))
+    for name in raw_imgs:
+        if name in unchanged:
+            if _mosaic is None or not changed_imgs:
+                response.add_text(f"Camera '{name}' unchanged since {unchanged[name]}")
+                camera_images[name] = f"unchanged since {unchanged[name]}"
+            continue
+        if _mosaic is None:
+            index = response.add_image(Image(data=jpegs[(name, "full")], format="jpeg"))
+            camera_images[name] = f"image {index} (full frame thumbnail)" if name in rois else f"image {index}"
+            if _frame_changes is not None:
+                _frame_changes.record(name, thumbs[name], response.reference(index))
+        if name in rois:
+            response.add_text(f"Camera '{name}' region of interest at camera resolution:")
+            index = response.add_image(Image(data=jpegs[(name, "roi")], format="jpeg"))
+            camera_images[name] += f", image {index} (region of interest crop)"
+    return camera_images
     
 
 
@@ -117,16 +256,21 @@ def get_state_with_images(result_json: dict, is_movement: bool = False) -> List[
 # @mcp.resource("robot://description")
 @mcp.tool(description="Get a description of the robot and instructions for the user. Run it before using any other tool.")
 def get_initial_instructions() -> str:
-    
+    # a new conversation starts here, it has not seen any image yet
+    global _distance_zone
+    if _frame_changes is not None:
+        _frame_changes.reset()
+    _distance_zone = None
     return robot_config.robot_description
 
 
 @mcp.tool(description="Get current robot state with images from all cameras. Returns list of objects: json with results of the move and current state of the robot and images from all cameras")
+@traced("mcp.get_robot_state")
 def get_robot_state():
     robot = get_robot()
-    move_result = robot.get_current_robot_state()
+    move_result = robot.get_current_robot_state(max_staleness_s=robot_config.STATE_OBSERVER["MAX_STALENESS_S"])
     result_json = move_result.to_json()
-    logger.info(f"MCP: get_robot_state outcome: {result_json.get("status", "success")}, Msg: {move_result.msg}")
+    log_event(logger, logging.INFO, "tool_call", "MCP: get_robot_state outcome: %s, Msg: %s", result_json.get("status", "success"), move_result.msg)
     return get_state_with_images(result_json, is_movement=False)
 
 
@@ -134,76 +278,104 @@ def get_robot_state():
 #-----------------------------move to dimm inspection location-------------------------
 
 @mcp.tool(description="Move to the predfined locations of dimms and take pictures.You can pass 1, 2, 3, or 4 as a string into the parameters to get different angles.")
+@traced("mcp.dimm_protocol")
 def dimm_protocol(different_location):
-    DIMM_LOC = {
-            "1": { "gripper": 0, "wrist_roll": -22.0, "wrist_flex": 72.0, "elbow_flex": 135.0, "shoulder_lift": 144.0, "shoulder_pan": 103.0 },
-            "2": { "gripper": 0, "wrist_roll": -23.0, "wrist_flex": 50.0, "elbow_flex": 80.0, "shoulder_lift": 101.0, "shoulder_pan": 83.0 },
-            "3": { "gripper": 0, "wrist_roll": -3.0, "wrist_flex": -14.0, "elbow_flex": 0.0, "shoulder_lift": 61.0, "shoulder_pan": 94.0 },
-            "4": { "gripper": 0, "wrist_roll": -3.0, "wrist_flex": 98.0, "elbow_flex": 145.0, "shoulder_lift": 134.0, "shoulder_pan": 88.0 },
-        }
-
-    robot = get_robot()
-    move_result = robot.get_current_robot_state()
-    result_json = move_result.to_json()
-    different_location = str(different_location)
-    robot.set_joints_absolute(DIMM_LOC[different_location])
-    return get_state_with_images(result_json, is_movement=False)
+    return _move_to_viewpoint("dimm", different_location)
 
 
 @mcp.tool(description="Move to the predfined locations of cpu and take pictures.You can pass 1, 2, 3, 4, 5 as a string into the parameters to get different angles.")
+@traced("mcp.cpu_protocol")
 def cpu_protocol(different_location):
-    CPU_LOC = {
-            "1": { 
-        "gripper": 0, 
-        "wrist_roll": -8.0, 
-        "wrist_flex": 35.0, 
-        "elbow_flex": 75.0, 
-        "shoulder_lift": 105.0, 
-        "shoulder_pan": 90.0 
-    },
-            "2": { 
-        "gripper": 0, 
-        "wrist_roll": -12.0, 
-        "wrist_flex": 70.0, 
-        "elbow_flex": 115.0, 
-        "shoulder_lift": 130.0, 
-        "shoulder_pan": 92.0 
-    },
-            "3": { 
-        "gripper": 0, 
-        "wrist_roll": -15.0, 
-        "wrist_flex": 20.0, 
-        "elbow_flex": 50.0, 
-        "shoulder_lift": 85.0, 
-        "shoulder_pan": 91.0 
-    },
-            "4": { 
-        "gripper": 0, 
-        "wrist_roll": -5.0, 
-        "wrist_flex": 55.0, 
-        "elbow_flex": 95.0, 
-        "shoulder_lift": 115.0, 
-        "shoulder_pan": 88.0 
-    },
-            "5": { 
-        "gripper": 0, 
-        "wrist_roll": -18.0, 
-        "wrist_flex": 85.0, 
-        "elbow_flex": 125.0, 
-        "shoulder_lift": 135.0, 
-        "shoulder_pan": 94.0 
-    },
-        }
+    return _move_to_viewpoint("cpu", different_location)
+
 
+#move to one viewpoint of robot_config.INSPECTION_VIEWPOINTS and return the state and images taken there
+def _move_to_viewpoint(target: str, location) -> Union[dict, List[Union[Image, dict, list]]]:
     robot = get_robot()
-    move_result = robot.get_current_robot_state()
+    viewpoints = robot_config.INSPECTION_VIEWPOINTS[target]
+    location = str(location)
+    if location not in viewpoints:
+        return {"status": "error", "message": f"Unknown {target} location '{location}', expected one of {list(viewpoints)}"}
+
+    move_result = robot.set_joints_absolute(viewpoints[location])
     result_json = move_result.to_json()
-    different_location = str(different_location)
-    robot.set_joints_absolute(CPU_LOC[different_location])
-    return get_state_with_images(result_json, is_movement=False)
-    
+    log_event(logger, logging.INFO, "tool_call", "MCP: %s viewpoint %s outcome: %s, Msg: %s", target, location,
+              result_json.get("status", "success"), move_result.msg)
+    return get_state_with_images(result_json, is_movement=True)
 
 
+@mcp.tool(description="Visit every predefined viewpoint of the dimms or the cpu in one call and take pictures at each of them. Expected input format: {target: 'dimm' or 'cpu', tiled: 'false'}. With tiled 'true' the views of each camera are combined into one labeled image. Returns list of objects: json with the tour results and current state of the robot, then the images labeled by viewpoint")
+@traced("mcp.inspection_tour")
+def inspection_tour(target, tiled=None):
+    robot = get_robot()
+    target = str(target).strip().lower()
+    log_event(logger, logging.INFO, "tool_call", "MCP Tool: inspection_tour received: target=%s, tiled=%s", target, tiled)
+    if target not in robot_config.INSPECTION_VIEWPOINTS:
+        return {"status": "error", "message": f"Unknown inspection target '{target}', expected one of {list(robot_config.INSPECTION_VIEWPOINTS)}"}
+
+    # viewpoints the arm cannot reach are left out instead of failing the whole tour
+    viewpoints: Dict[str, Dict[str, float]] = {}
+    skipped: List[str] = []
+    for name, pose in robot_config.INSPECTION_VIEWPOINTS[target].items():
+        is_valid, error_msg = robot.check_if_valid_position(pose)
+        if is_valid:
+            viewpoints[name] = pose
+        else:
+            skipped.append(f"Viewpoint '{name}' skipped: {error_msg}")
+    if not viewpoints:
+        return {"status": "error", "message": f"No reachable {target} viewpoints", "warnings": skipped}
+
+    order = order_viewpoints(robot.commanded_deg, viewpoints, robot.estimate_move_duration)
+
+    # one frame set per viewpoint, encoded after the tour so the next move is not held up
+    captured: List[Tuple[str, Dict[str, CameraFrame]]] = []
+    capture_warnings: List[str] = []
+
+    def capture_viewpoint(number: int, step: ScriptStep) -> None:
+        try:
+            frames = _capture_frames(robot, True, {"warnings": capture_warnings})
+        except Exception as e:
+            logger.error("Error capturing images at %s: %s", step.describe(), e, exc_info=True)
+            capture_warnings.append(f"No images at {step.describe()}: {e}")
+            return
+        captured.append((order[number - 1], frames))
+
+    tour_result = robot.run_motion_script(tour_steps(viewpoints, order), on_checkpoint=capture_viewpoint)
+    result_json = tour_result.to_json()
+    result_json["tour_order"] = order
+    if skipped or capture_warnings:
+        result_json.setdefault("warnings", []).extend(skipped + capture_warnings)
+    result_json["robot_state"] = result_json["robot_state"]["human_readable_state"]
+    log_event(logger, logging.INFO, "tool_call", "MCP: inspection_tour outcome: %s, Msg: %s, viewpoints captured: %d",
+              result_json.get("status", "success"), tour_result.msg, len(captured))
+
+    # the text labels end up apart from the images in the client, the result json says which image shows what
+    response = _new_response()
+    result_json["response_number"] = response.number
+    try:
+        if as_bool(tiled) and captured:
+            # one grid per camera, cells in tour order
+            tiled_images: Dict[str, str] = {}
+            for camera_name in captured[0][1]:
+                views = [(name, frames[camera_name].image) for name, frames in captured if camera_name in frames]
+                with span("mcp.tile_images", images=len(views)):
+                    tiled_img = tile_images([img for _, img in views], [f"viewpoint {name}" for name, _ in views])
+                cells = f"viewpoints {', '.join(name for name, _ in views)} (left to right, top to bottom)"
+                response.add_text(f"Camera '{camera_name}', {cells}:")
+                index = response.add_image(_np_to_mcp_image(tiled_img, camera_name))
+                tiled_images[camera_name] = f"image {index}, {cells}"
+            result_json["tiled_images"] = tiled_images
+        else:
+            viewpoint_images: Dict[str, Dict[str, str]] = {}
+            for name, frames in captured:
+                response.add_text(f"Viewpoint '{name}':")
+                viewpoint_images[name] = _image_parts(frames, response)
+            result_json["viewpoint_images"] = viewpoint_images
+    except Exception as e:
+        logger.error("Error encoding inspection images: %s", e, exc_info=True)
+        response.add_text("Error getting camera images")
+    return [result_json] + response.parts
+
 
 #------------------------------------functions to move the arm------------------------------------------
 
@@ -217,13 +389,18 @@ def cpu_protocol(different_location):
             tilt_gripper_down_angle (float, optional): Angle to tilt gripper down (positive) or up (negative) in degrees
             rotate_gripper_right_angle (float, optional): Angle to rotate gripper clockwise (positive) or counterclockwise (negative) in degrees
             rotate_robot_right_angle (float, optional): Angle to rotate entire robot clockwise/right (positive) or counterclockwise/left (negative) in degrees
+            straight_line (bool, optional): If true, the gripper travels along a straight line to the up/forward target instead of an arc
+            distance_zone (str, optional): Distance zone to the target as you judge it from the latest images: far, medium, near or grasp.
+                In near and grasp the wrist camera adds a crop of the gripper area at camera resolution. Kept until you report another zone
         Expected input format:
         {
             "move_gripper_up_mm": "10", # Will move up 1 cm
             "move_gripper_forward_mm": "-5", # Will move backward 5 mm
             "tilt_gripper_down_angle": "10", # Will tilt gripper down 10 degrees
             "rotate_gripper_clockwise_angle": "-15", # Will rotate gripper counterclockwise 15 degrees
-            "rotate_robot_right_angle": "15" # Will rotate robot clockwise (to the right) 15 degrees
+            "rotate_robot_right_angle": "15", # Will rotate robot clockwise (to the right) 15 degrees
+            "straight_line": "true", # Will move the gripper in a straight line
+            "distance_zone": "near" # The gripper is 2-5 cm from the target
         }
         Returns:
             list: List containing:
@@ -235,12 +412,20 @@ def cpu_protocol(different_location):
                 - Camera images
     """
         )
-def move_robot(move_gripper_up_mm=None, move_gripper_forward_mm=None, tilt_gripper_down_angle=None, rotate_gripper_clockwise_angle=None, rotate_robot_right_angle=None):
+@traced("mcp.move_robot")
+def move_robot(move_gripper_up_mm=None, move_gripper_forward_mm=None, tilt_gripper_down_angle=None, rotate_gripper_clockwise_angle=None, rotate_robot_right_angle=None, straight_line=None, distance_zone=None):
     
+    global _distance_zone
     robot = get_robot()
-    logger.info(f"MCP Tool: move_robot received: up={move_gripper_up_mm}, fwd={move_gripper_forward_mm}, "
-                f"tilt={tilt_gripper_down_angle}, grip_rot={rotate_gripper_clockwise_angle}, "
-                f"robot_rot={rotate_robot_right_angle}")
+    log_event(logger, logging.INFO, "tool_call", "MCP Tool: move_robot received: up=%s, fwd=%s, tilt=%s, grip_rot=%s, robot_rot=%s, straight_line=%s, zone=%s",
+              move_gripper_up_mm, move_gripper_forward_mm, tilt_gripper_down_angle, rotate_gripper_clockwise_angle,
+              rotate_robot_right_angle, straight_line, distance_zone)
+
+    if distance_zone is not None:
+        zone = str(distance_zone).strip().lower()
+        if zone not in DISTANCE_ZONES:
+            return {"status": "error", "message": f"Unknown distance_zone '{distance_zone}', expected one of {list(DISTANCE_ZONES)}"}
+        _distance_zone = zone
 
     # All parameters are optional for execute_intuitive_move
     # Convert MCP tool parameters to match the arguments of execute_intuitive_move
@@ -259,28 +444,34 @@ def move_robot(move_gripper_up_mm=None, move_gripper_forward_mm=None, tilt_gripp
         current_state_result = robot.get_current_robot_state()
         result_json = current_state_result.to_json()
         result_json["message"] = "No movement parameters provided to move_robot tool."
-        logger.info(f"MCP: move_robot outcome: {result_json.get('status', 'success')}, Msg: {result_json.get('message', '')}")
+        log_event(logger, logging.INFO, "tool_call", "MCP: move_robot outcome: %s, Msg: %s", result_json.get('status', 'success'), result_json.get('message', ''))
         return get_state_with_images(result_json, is_movement=False)
 
+    if as_bool(straight_line):
+        actual_move_params["straight_line"] = True
+
     move_execution_result = robot.execute_interpolated(**actual_move_params)
     result_json = move_execution_result.to_json()
     
-    logger.info(f"MCP: move_robot final outcome: {result_json.get('status', 'success')}, Msg: {result_json.get('message', '')}, Warnings: {len(result_json.get('warnings', []))}")
+    log_event(logger, logging.INFO, "tool_call", "MCP: move_robot final outcome: %s, Msg: %s, Warnings: %d",
+              result_json.get('status', 'success'), result_json.get('message', ''), len(result_json.get('warnings', [])))
     
     return get_state_with_images(result_json, is_movement=True)
 
 
 @mcp.tool(description="Control the robot's gripper openness from 0% (completely closed) to 100% (completely open). Expected input format: {gripper_openness_pct: '50'}. Returns list of objects: json with results of the move and current state of the robot and images from all cameras")
+@traced("mcp.control_gripper")
 def control_gripper(gripper_openness_pct):
     robot = get_robot()
     
     try:
         openness = float(gripper_openness_pct)
-        logger.info(f"MCP Tool: control_gripper called with openness={gripper_openness_pct}%")
+        log_event(logger, logging.INFO, "tool_call", "MCP Tool: control_gripper called with openness=%s%%", gripper_openness_pct)
         
         move_result = robot.set_joints_absolute({'gripper': openness})
         result_json = move_result.to_json()
-        logger.info(f"MCP: control_gripper outcome: {result_json.get('status', 'success')}, Msg: {move_result.msg}, Warnings: {len(move_result.warnings)}")
+        log_event(logger, logging.INFO, "tool_call", "MCP: control_gripper outcome: %s, Msg: %s, Warnings: %d",
+                  result_json.get('status', 'success'), move_result.msg, len(move_result.warnings))
         return get_state_with_images(result_json, is_movement=True)
         
     except (ValueError, TypeError) as e:
@@ -288,6 +479,96 @@ def control_gripper(gripper_openness_pct):
         return {"status": "error", "message": f"Invalid gripper openness value: {str(e)}"}
 
 
+@mcp.tool(
+        description="""
+        Run several moves, gripper commands, presets and joint positions in one call. The whole script is checked against the workspace
+        and joint limits before anything moves, then runs without returning to you in between.
+        Images are only taken at the end and after steps marked with "checkpoint": true.
+        Use it for sequences that need no looking in between, like open gripper, move down, close gripper, move up.
+        Args:
+            steps (list): Ordered steps, each one of:
+                {"move": {...}} with the same parameters as move_robot (including straight_line)
+                {"gripper": 0-100} gripper openness in %
+                {"preset": "1"} a preset position
+                {"joints": {"shoulder_pan": 90, "wrist_roll": 0}} absolute joint angles in degrees, joints left out keep their angle
+        Expected input format:
+        {
+            "steps": [
+                {"gripper": 100},
+                {"move": {"move_gripper_up_mm": -30, "straight_line": true}, "checkpoint": true},
+                {"gripper": 0},
+                {"move": {"move_gripper_up_mm": 50}}
+            ]
+        }
+        Returns:
+            list: List containing:
+                - JSON object with status, message, warnings, robot_state and per-step results under timing.steps,
+                  checkpoint_images maps every checkpoint to its image numbers, camera_images the final images
+                - For every checkpoint a label followed by its camera images
+                - Camera images at the end of the script
+    """
+        )
+@traced("mcp.run_motion_script")
+def run_motion_script(steps):
+    robot = get_robot()
+    log_event(logger, logging.INFO, "tool_call", "MCP Tool: run_motion_script received: %s", steps)
+
+    try:
+        script = parse_script(steps, robot_config.MOTION_SCRIPT["MAX_STEPS"])
+    except ValueError as e:
+        logger.error(f"MCP: run_motion_script received an invalid script: {e}")
+        return {"status": "error", "message": f"Invalid motion script: {e}"}
+
+    # checkpoint frames are kept raw and encoded with the final ones once the script is done
+    checkpoint_warnings: List[str] = []
+    checkpoints: List[Tuple[int, ScriptStep, Dict[str, CameraFrame]]] = []
+
+    # runs on the motion thread between steps, a camera problem must not abort the script
+    def capture_checkpoint(number: int, step: ScriptStep) -> None:
+        try:
+            frames = _capture_frames(robot, True, {"warnings": checkpoint_warnings})
+        except Exception as e:
+            logger.error("Error capturing checkpoint images: %s", e, exc_info=True)
+            checkpoint_warnings.append(f"No images for the checkpoint after step {number}: {e}")
+            return
+        checkpoints.append((number, step, frames))
+
+    script_result = robot.run_motion_script(script, on_checkpoint=capture_checkpoint)
+    result_json = script_result.to_json()
+    if checkpoint_warnings:
+        result_json.setdefault("warnings", []).extend(checkpoint_warnings)
+    log_event(logger, logging.INFO, "tool_call", "MCP: run_motion_script outcome: %s, Msg: %s",
+              result_json.get("status", "success"), script_result.msg)
+
+    # checkpoint images come first, the images at the end of the script are added after them
+    # {"after step N": camera_images} says which image of the response shows what, text labels end up apart from them
+    response = _new_response()
+    checkpoint_images: Dict[str, Dict[str, str]] = {}
+    try:
+        for number, step, frames in checkpoints:
+            response.add_text(f"Checkpoint after step {number} ({step.describe()}):")
+            checkpoint_images[f"after step {number}"] = _image_parts(frames, response)
+    except Exception as e:
+        logger.error("Error encoding checkpoint images: %s", e, exc_info=True)
+        response.add_text("Error getting checkpoint images")
+    if checkpoint_images:
+        result_json["checkpoint_images"] = checkpoint_images
+    if response.parts:
+        response.add_text("End of script:")
+    return get_state_with_images(result_json, is_movement=True, response=response)
+
+
+#------------------------------------tracing------------------------------------------
+
+@mcp.tool(description="Turn tracing of tool calls on or off. Turning it off writes the session as a Chrome/Perfetto trace JSON file and returns its path. Expected input format: {enabled: 'true'}")
+def set_tracing(enabled):
+    if as_bool(enabled):
+        session = tracing.enable(robot_config.TRACING["MAX_EVENTS"])
+        return {"tracing": True, "session": session}
+    path = tracing.disable(robot_config.TRACING["DIR"])
+    return {"tracing": False, "trace_file": path}
+
+
 #------------------------------------shutdown------------------------------------------
 
 #disconnect
@@ -299,6 +580,9 @@ def _cleanup():
             _robot.disconnect()
         except Exception as e_disc:
             logger.error(f"MCP: Exception during _robot.disconnect(): {e_disc}", exc_info=True)
+    # keep the session that was being traced when the server went down
+    if tracing.enabled():
+        tracing.disable(robot_config.TRACING["DIR"])
 
 atexit.register(_cleanup)
 
@@ -307,6 +591,8 @@ atexit.register(_cleanup)
 
 if __name__ == "__main__":
     logger.info("Starting MCP Robot Server...")
+    if robot_config.TRACING["ENABLED"]:
+        tracing.enable(robot_config.TRACING["MAX_EVENTS"])
     try:
         mcp.run()
     except SystemExit as e:
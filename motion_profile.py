@@ -0,0 +1,78 @@
+"""
+Synchronized time-optimal motion profiles. Every joint follows the same normalized progress s(t) from 0 to 1,
+scaled by its own travel, and the duration is the shortest one that keeps every joint inside its limits.
+"""
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+PROFILES = ("linear", "trapezoidal", "minimum_jerk")
+
+# peak |s'|, |s''| and |s'''| of the minimum-jerk polynomial 10t^3 - 15t^4 + 6t^5 over a unit duration
+MIN_JERK_PEAK_VEL = 1.875
+MIN_JERK_PEAK_ACC = 10.0 / math.sqrt(3.0)
+MIN_JERK_PEAK_JERK = 60.0
+
+
+@dataclass(frozen=True)
+class ProfileTiming:
+    profile: str
+    duration_s: float
+    accel_time_s: float = 0.0  # trapezoidal only, length of the acceleration and deceleration ramps
+
+
+#shortest duration for joints travelling extent (deg, or deg per unit of path for curved paths) under the limits
+def synchronized_timing(profile: str, extent: np.ndarray, max_vel: np.ndarray, max_acc: np.ndarray, max_jerk: np.ndarray) -> ProfileTiming:
+    extent = np.abs(np.asarray(extent, dtype=np.float64))
+    # the most constrained joint decides, these are the per-limit worst cases over all joints
+    vel_bound = float(np.max(extent / max_vel, initial=0.0))
+    acc_bound = float(np.max(extent / max_acc, initial=0.0))
+    jerk_bound = float(np.max(extent / max_jerk, initial=0.0))
+    if vel_bound == 0.0 and acc_bound == 0.0:
+        return ProfileTiming(profile, 0.0)
+
+    if profile == "trapezoidal":
+        # a unit trapezoid with ramps ta and total T peaks at s' = 1/(T - ta) and s'' = 1/(ta (T - ta));
+        # with u = T - ta the constraints are u >= vel_bound and ta >= acc_bound / u, and T = u + acc_bound / u
+        # is smallest at u = sqrt(acc_bound) unless the velocity limit forces a longer cruise
+        cruise = max(vel_bound, math.sqrt(acc_bound))
+        accel_time = acc_bound / cruise
+        return ProfileTiming(profile, cruise + accel_time, accel_time)
+
+    if profile == "minimum_jerk":
+        duration = max(MIN_JERK_PEAK_VEL * vel_bound, math.sqrt(MIN_JERK_PEAK_ACC * acc_bound), (MIN_JERK_PEAK_JERK * jerk_bound) ** (1.0 / 3.0))
+        return ProfileTiming(profile, duration)
+
+    raise ValueError(f"Unknown motion profile '{profile}', expected one of {PROFILES}")
+
+
+#normalized progress s at times t (seconds), clipped to [0, 1]
+def progress(timing: ProfileTiming, t: np.ndarray) -> np.ndarray:
+    t = np.asarray(t, dtype=np.float64)
+    if timing.duration_s <= 0.0:
+        return np.ones_like(t)
+    tau = np.clip(t / timing.duration_s, 0.0, 1.0)
+
+    if timing.profile == "minimum_jerk":
+        return tau**3 * (10.0 - 15.0 * tau + 6.0 * tau**2)
+
+    # trapezoidal: accelerate, cruise, decelerate with peak velocity 1 / (T - ta)
+    total = timing.duration_s
+    ramp = timing.accel_time_s
+    peak_vel = 1.0 / (total - ramp)
+    accel = peak_vel / ramp if ramp > 0 else 0.0
+    t = tau * total
+    return np.where(
+        t < ramp, 0.5 * accel * t**2,
+        np.where(t <= total - ramp, peak_vel * (t - 0.5 * ramp), 1.0 - 0.5 * accel * (total - t) ** 2),
+    )
+
+
+#progress samples at every control period after t = 0, the last sample is always exactly 1
+def sample_progress(timing: ProfileTiming, period_s: float) -> np.ndarray:
+    steps = max(1, int(math.ceil(timing.duration_s / period_s - 1e-9)))
+    fractions = progress(timing, np.arange(1, steps + 1, dtype=np.float64) * period_s)
+    fractions[-1] = 1.0
+    return fractions
@@ -0,0 +1,107 @@
+"""
+Multi-step motion scripts: an ordered list of moves, gripper commands, presets and joint poses run server-side in one tool call
+Steps are parsed here, the controller validates the whole script against kinematics and joint limits before moving
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+# move step parameters, same names and meaning as the move_robot tool
+MOVE_PARAMS = (
+    "move_gripper_up_mm",
+    "move_gripper_forward_mm",
+    "tilt_gripper_down_angle",
+    "rotate_gripper_clockwise_angle",
+    "rotate_robot_right_angle",
+)
+
+STEP_KINDS = ("move", "gripper", "preset", "joints")
+
+
+#one script step, params holds the move parameters, {"openness_pct": ...}, {"name": ...} or the absolute joint
+#positions in degrees depending on kind; checkpoint steps capture camera images once the arm has settled after them
+#label names the step in results instead of its parameters (e.g. the viewpoint of an inspection tour)
+@dataclass
+class ScriptStep:
+    kind: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    checkpoint: bool = False
+    label: str = ""
+
+    #short human readable form for results and error messages
+    def describe(self) -> str:
+        if self.label:
+            return self.label
+        if self.kind == "joints":
+            return "joints " + ", ".join(f"{name}={value:g}" for name, value in self.params.items())
+        if self.kind == "gripper":
+            return f"gripper {self.params['openness_pct']:g}%"
+        if self.kind == "preset":
+            return f"preset '{self.params['name']}'"
+        moves = ", ".join(f"{name}={value:g}" for name, value in self.params.items() if name in MOVE_PARAMS)
+        return moves + (" (straight line)" if self.params.get("straight_line") else "")
+
+
+#tool arguments may arrive as JSON booleans or as strings like "true", the MCP server parses its flags with this too
+def as_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
+
+
+def _parse_step(raw: Any) -> ScriptStep:
+    if not isinstance(raw, dict):
+        raise ValueError(f"expected an object like {{\"move\": {{...}}}}, got {raw!r}")
+    kinds = [kind for kind in STEP_KINDS if kind in raw]
+    if len(kinds) != 1:
+        raise ValueError(f"needs exactly one of {', '.join(STEP_KINDS)}")
+    kind = kinds[0]
+    unknown = set(raw) - {kind, "checkpoint"}
+    if unknown:
+        raise ValueError(f"unknown keys {sorted(unknown)}")
+    checkpoint = as_bool(raw.get("checkpoint", False))
+    value = raw[kind]
+
+    if kind == "gripper":
+        return ScriptStep(kind, {"openness_pct": float(value)}, checkpoint)
+    if kind == "preset":
+        return ScriptStep(kind, {"name": str(value)}, checkpoint)
+    if kind == "joints":
+        if not isinstance(value, dict) or not value:
+            raise ValueError("joints needs an object of joint positions in degrees")
+        return ScriptStep(kind, {name: float(pos) for name, pos in value.items()}, checkpoint)
+
+    if not isinstance(value, dict):
+        raise ValueError("move needs an object of move parameters")
+    unknown = set(value) - set(MOVE_PARAMS) - {"straight_line"}
+    if unknown:
+        raise ValueError(f"unknown move parameters {sorted(unknown)}")
+    params: Dict[str, Any] = {name: float(value[name]) for name in MOVE_PARAMS if value.get(name) is not None}
+    if not params:
+        raise ValueError("move has no movement parameters")
+    if as_bool(value.get("straight_line", False)):
+        params["straight_line"] = True
+    return ScriptStep(kind, params, checkpoint)
+
+
+#steps as a list (or its JSON string) of {"move": {...}}, {"gripper": pct}, {"preset": name} or {"joints": {...}}, each optionally with
+#"checkpoint": true; raises ValueError naming the first bad step
+def parse_script(steps: Any, max_steps: int) -> List[ScriptStep]:
+    if isinstance(steps, str):
+        try:
+            steps = json.loads(steps)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"steps is not valid JSON: {e}") from e
+    if not isinstance(steps, list) or not steps:
+        raise ValueError("steps must be a non-empty list")
+    if len(steps) > max_steps:
+        raise ValueError(f"script has {len(steps)} steps, at most {max_steps} are allowed")
+
+    script = []
+    for index, raw in enumerate(steps, start=1):
+        try:
+            script.append(_parse_step(raw))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Step {index}: {e}") from e
+    return script
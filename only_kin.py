@@ -1,5 +1,8 @@
 import math
-from typing import Tuple,Dict,Any
+from typing import Tuple,Dict,Any,Optional
+import numpy as np
+
+from tracing import traced
 
 
 class KinematicsM:
@@ -20,11 +23,24 @@ class KinematicsM:
     def forward_kin(self,shoulder_lift_deg,elbow_flex_deg) -> tuple[float,float]:
         
             ang_shoulder_fk = math.radians(shoulder_lift_deg) + self.SMOMMRAD
-            ang_elbow_fk = math.radians(elbow_flex_deg) + self.EMOMMRAD
+            #elbow servo reads relative to the upper arm, same convention inverse_kin solves for
+            ang_elbow_fk = math.radians(elbow_flex_deg - shoulder_lift_deg) + self.EMOMMRAD
             x = -self.L1 * math.cos(ang_shoulder_fk)  + self.L2 * math.cos(ang_elbow_fk)
             z = self.L1 * math.sin(ang_shoulder_fk) + self.L2 * math.sin(ang_elbow_fk) + self.BHMM
             
             return x,z
+
+    #forward_kin for N poses at once, accepts arrays (or scalars) and returns (x, z) arrays of the broadcast shape
+    @traced("kinematics.forward_kin")
+    def forward_kin_batch(self, shoulder_lift_deg, elbow_flex_deg) -> Tuple[np.ndarray, np.ndarray]:
+            shoulder_lift_deg = np.asarray(shoulder_lift_deg, dtype=np.float64)
+            ang_shoulder_fk = np.radians(shoulder_lift_deg) + self.SMOMMRAD
+            #elbow servo reads relative to the upper arm, same convention inverse_kin solves for
+            ang_elbow_fk = np.radians(np.asarray(elbow_flex_deg, dtype=np.float64) - shoulder_lift_deg) + self.EMOMMRAD
+            x = -self.L1 * np.cos(ang_shoulder_fk) + self.L2 * np.cos(ang_elbow_fk)
+            z = self.L1 * np.sin(ang_shoulder_fk) + self.L2 * np.sin(ang_elbow_fk) + self.BHMM
+
+            return x, z
         
     #calculate shoulder lift and elbow angle for target X,Z 
     def inverse_kin(self,target_x,target_z) -> tuple[float,float]:
@@ -51,6 +67,38 @@ class KinematicsM:
         elbow_flex_deg = math.degrees(angle2 + math.radians(shoulder_lift_deg)) - math.degrees(self.EMOMMRAD)
         
         
+        return shoulder_lift_deg, elbow_flex_deg
+
+    #inverse_kin for N targets at once, accepts arrays (or scalars) and returns (shoulder_lift, elbow_flex) arrays
+    @traced("kinematics.inverse_kin")
+    def inverse_kin_batch(self, target_x, target_z) -> Tuple[np.ndarray, np.ndarray]:
+        target_x = np.asarray(target_x, dtype=np.float64)
+        target_z = np.asarray(target_z, dtype=np.float64)
+
+        #find the hypoth of blue triangle
+        z_adj = target_z - self.BHMM
+        hypoth_d = target_x**2 + z_adj**2
+        d = np.sqrt(hypoth_d)
+        
+        #first component to find angle one
+        phi1 = np.arctan2(z_adj, target_x)
+        #second component to find angle one
+        with np.errstate(divide="ignore", invalid="ignore"):
+            phi2 = np.arccos(np.clip((self.L1**2 + hypoth_d - self.L2**2) / (2 * self.L1 * d), -1.0, 1.0))
+        
+        #angle1 in rad
+        shoulder_lift_deg = 180.0 - np.degrees(phi1 + phi2) - np.degrees(self.SMOMMRAD)
+        angle1 = np.radians(shoulder_lift_deg) + self.SMOMMRAD
+        
+        #set up to find angle 2 (works when angle2 is greater than 180 degrees)
+        cos2_arg = np.clip((target_x + self.L1 * np.cos(angle1)) / self.L2, -1.0, 1.0)
+        sin2_arg = np.clip((z_adj - self.L1 * np.sin(angle1)) / self.L2, -1.0, 1.0)
+        angle2 = np.arctan2(sin2_arg, cos2_arg)
+        
+        #cal wrist flex since the change in angle 1 and angle 2 will effect wrist tilt
+        elbow_flex_deg = np.degrees(angle2 + np.radians(shoulder_lift_deg)) - np.degrees(self.EMOMMRAD)
+        
+        
         return shoulder_lift_deg, elbow_flex_deg
         
 
@@ -70,4 +118,42 @@ class KinematicsM:
         
         if distance > max_reach - 1:
             return False, f"Target ({x:.1f},{z:.1f})mm is beyond max reach {max_reach-1:.1f}mm (safety margin: 1mm), distance is {distance:.1f}mm"
-        return True, "Valid" 
\ No newline at end of file
+        return True, "Valid"
+
+    #is_valid_target_cart for N targets, returns a validity mask and the per-element reason ("Valid" when ok)
+    #with_reasons=False skips building the messages, which is what workspace sweeps want
+    @traced("kinematics.is_valid_target_cart")
+    def is_valid_target_cart_batch(self, x, z, with_reasons: bool = True) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        x, z = np.broadcast_arrays(np.asarray(x, dtype=np.float64), np.asarray(z, dtype=np.float64))
+        max_reach = self.L1 + self.L2
+        distance = np.sqrt((z - self.BHMM)**2 + x**2)
+
+        # checked in order, an element reports the first limit it breaks
+        failures = [
+            ~((self.SL["x"][0] <= x) & (x <= self.SL["x"][1])),
+            ~((self.SL["z"][0] <= z) & (z <= self.SL["z"][1])),
+            (x < 20) & (z < 150),
+            distance > max_reach - 1,
+        ]
+        valid = np.ones(x.shape, dtype=bool)
+        first_failure = np.full(x.shape, -1, dtype=np.int8)
+        for k, failed in enumerate(failures):
+            hit = failed & valid
+            first_failure[hit] = k
+            valid &= ~failed
+
+        if not with_reasons:
+            return valid, None
+
+        reasons = np.full(x.shape, "Valid", dtype=object)
+        for idx in map(tuple, np.argwhere(~valid)):
+            xi, zi, k = float(x[idx]), float(z[idx]), first_failure[idx]
+            if k == 0:
+                reasons[idx] = f"Target X {xi:.1f}mm out of range {self.SL['x']}"
+            elif k == 1:
+                reasons[idx] = f"Target Z {zi:.1f}mm out of range {self.SL['z']}"
+            elif k == 2:
+                reasons[idx] = f"Target ({xi:.1f},{zi:.1f})mm violates: if x < 20mm, z must be >= 150mm."
+            else:
+                reasons[idx] = f"Target ({xi:.1f},{zi:.1f})mm is beyond max reach {max_reach-1:.1f}mm (safety margin: 1mm), distance is {float(distance[idx]):.1f}mm"
+        return valid, reasons
@@ -0,0 +1,196 @@
+"""
+Simulated SO-101 follower for running the controller, MCP server and keyboard control without hardware.
+Same connect / get_observation / send_action / bus / cameras interface as the lerobot followers, with modelled joint
+dynamics, bus latency and synthetic camera frames
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from config_robot import robot_config
+from joint_conv import JointConverter
+
+logger = logging.getLogger(__name__)
+
+# integration step of the joint model, small enough that the velocity limit and lag look continuous
+SIM_DT_S = 0.002
+
+
+#follower config, port is accepted for compatibility with lerobot_config and ignored
+#the dynamics and latency defaults come from robot_config.SIMULATION
+@dataclass
+class SimulatedSO101FollowerConfig:
+    port: str = ""
+    cameras: Dict[str, Any] = field(default_factory=dict)
+    id: Optional[str] = None
+    max_relative_target: Optional[float] = None
+    disable_torque_on_disconnect: bool = True
+    read_latency_s: float = field(default_factory=lambda: robot_config.SIMULATION["READ_LATENCY_S"])
+    write_latency_s: float = field(default_factory=lambda: robot_config.SIMULATION["WRITE_LATENCY_S"])
+    max_speed_norm_s: float = field(default_factory=lambda: robot_config.SIMULATION["MAX_SPEED_NORM_S"])
+    time_constant_s: float = field(default_factory=lambda: robot_config.SIMULATION["TIME_CONSTANT_S"])
+    initial_preset: str = field(default_factory=lambda: robot_config.SIMULATION["INITIAL_PRESET"])
+
+
+class SimulatedMotorsBus:
+
+    #positions are normalized like the real bus, each motor lags behind its goal and is speed limited
+    def __init__(self, config: SimulatedSO101FollowerConfig, initial_positions: Dict[str, float]) -> None:
+        self.config = config
+        self.motors = list(initial_positions.keys())
+        self._position = np.array([initial_positions[m] for m in self.motors], dtype=np.float64)
+        self._goal = self._position.copy()
+        self._last_update = time.monotonic()
+        self.torque_enabled = True
+        # one transaction at a time, like the half-duplex serial bus
+        self._bus_lock = threading.Lock()
+        self.reads = 0
+        self.writes = 0
+
+    def _advance(self, now: float) -> None:
+        elapsed = now - self._last_update
+        self._last_update = now
+        if not self.torque_enabled or elapsed <= 0:
+            return
+
+        tau = max(self.config.time_constant_s, 1e-6)
+        vmax = self.config.max_speed_norm_s
+        while elapsed > 0:
+            dt = min(SIM_DT_S, elapsed)
+            velocity = np.clip((self._goal - self._position) / tau, -vmax, vmax)
+            self._position += velocity * dt
+            elapsed -= dt
+
+    def sync_read(self, data_name: str, motors: Optional[List[str]] = None) -> Dict[str, float]:
+        if data_name not in ("Present_Position", "Goal_Position"):
+            raise ValueError(f"Simulated bus cannot read '{data_name}'")
+        with self._bus_lock:
+            time.sleep(self.config.read_latency_s)
+            self._advance(time.monotonic())
+            values = self._position if data_name == "Present_Position" else self._goal
+            self.reads += 1
+            return {m: float(values[i]) for i, m in enumerate(self.motors) if motors is None or m in motors}
+
+    def sync_write(self, data_name: str, values: Dict[str, float]) -> None:
+        if data_name != "Goal_Position":
+            raise ValueError(f"Simulated bus cannot write '{data_name}'")
+        with self._bus_lock:
+            time.sleep(self.config.write_latency_s)
+            self._advance(time.monotonic())
+            if self.torque_enabled:
+                for motor, value in values.items():
+                    self._goal[self.motors.index(motor)] = value
+            self.writes += 1
+
+    def disable_torque(self, motors: Optional[List[str]] = None) -> None:
+        with self._bus_lock:
+            self._advance(time.monotonic())
+            self.torque_enabled = False
+            self._goal = self._position.copy()
+
+    def enable_torque(self, motors: Optional[List[str]] = None) -> None:
+        with self._bus_lock:
+            self._last_update = time.monotonic()
+            self._goal = self._position.copy()
+            self.torque_enabled = True
+
+
+class SimulatedCamera:
+
+    #synthetic frames at the configured resolution and fps, a marker follows the arm so frames change with motion
+    def __init__(self, name: str, config: Any, bus: SimulatedMotorsBus) -> None:
+        self.name = name
+        self.width = int(getattr(config, "width", None) or 640)
+        self.height = int(getattr(config, "height", None) or 480)
+        self.fps = float(getattr(config, "fps", None) or 30)
+        self.bus = bus
+        self._next_frame = time.monotonic()
+
+        # static background: horizontal / vertical gradients, different per camera
+        seed = sum(name.encode()) % 64
+        xs = np.linspace(0, 255, self.width, dtype=np.float32)
+        ys = np.linspace(0, 255, self.height, dtype=np.float32)
+        background = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        background[..., 0] = xs[None, :] * 0.5 + seed
+        background[..., 1] = ys[:, None] * 0.5 + 32
+        background[..., 2] = 96
+        self._background = background
+
+    #render the current view without waiting for the frame period
+    def async_read(self, timeout_ms: float = 200) -> np.ndarray:
+        positions = self.bus.sync_read("Present_Position")
+        frame = self._background.copy()
+        size = max(8, min(self.width, self.height) // 8)
+        # the marker position follows shoulder_pan (x) and shoulder_lift (y)
+        cx = int((positions.get("shoulder_pan", 0.0) + 100.0) / 200.0 * (self.width - size))
+        cy = int((positions.get("shoulder_lift", 0.0) + 100.0) / 200.0 * (self.height - size))
+        cx, cy = min(max(cx, 0), self.width - size), min(max(cy, 0), self.height - size)
+        frame[cy:cy + size, cx:cx + size] = (255, 255, 255)
+        return frame
+
+    #block until the next frame period like a real capture, then render
+    def read(self) -> np.ndarray:
+        now = time.monotonic()
+        self._next_frame = max(self._next_frame + 1.0 / self.fps, now)
+        if self._next_frame > now:
+            time.sleep(self._next_frame - now)
+        return self.async_read()
+
+    def connect(self) -> None:
+        pass
+
+    def disconnect(self) -> None:
+        pass
+
+
+class SimulatedSO101Follower:
+
+    name = "so101_sim"
+
+    def __init__(self, config: SimulatedSO101FollowerConfig) -> None:
+        self.config = config
+        converter = JointConverter(robot_config.MOTOR_NORMALIZED_TO_DEGREE_MAPPING)
+        home = robot_config.PRESET_POSITIONS.get(config.initial_preset, {})
+        initial = {name: float(converter.deg_to_norm([home.get(name, 0.0)], converter.columns([name]))[0])
+                   for name in converter.names}
+        self.bus = SimulatedMotorsBus(config, initial)
+        self.cameras = {name: SimulatedCamera(name, cam_cfg, self.bus) for name, cam_cfg in config.cameras.items()}
+        self._connected = False
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connected
+
+    def connect(self, calibrate: bool = True) -> None:
+        for camera in self.cameras.values():
+            camera.connect()
+        self._connected = True
+        logger.info(f"Simulated follower connected with cameras {list(self.cameras)}")
+
+    def disconnect(self) -> None:
+        if self.config.disable_torque_on_disconnect:
+            self.bus.disable_torque()
+        for camera in self.cameras.values():
+            camera.disconnect()
+        self._connected = False
+
+    def get_observation(self) -> Dict[str, Any]:
+        observation: Dict[str, Any] = {f"{motor}.pos": value for motor, value in self.bus.sync_read("Present_Position").items()}
+        for name, camera in self.cameras.items():
+            observation[name] = camera.async_read()
+        return observation
+
+    #same contract as the lerobot followers: {"<motor>.pos": goal} in, the goal actually sent out
+    def send_action(self, action: Dict[str, Any]) -> Dict[str, Any]:
+        goal = {key.removesuffix(".pos"): float(value) for key, value in action.items() if key.endswith(".pos")}
+        if self.config.max_relative_target is not None:
+            present = self.bus.sync_read("Present_Position", list(goal))
+            limit = self.config.max_relative_target
+            goal = {m: present[m] + max(-limit, min(limit, v - present[m])) for m, v in goal.items()}
+        self.bus.sync_write("Goal_Position", goal)
+        return {f"{motor}.pos": value for motor, value in goal.items()}
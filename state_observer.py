@@ -0,0 +1,128 @@
+"""
+Background observer that polls the arm and publishes immutable, versioned state snapshots
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+
+#one immutable reading of the arm, version increases by one with every published snapshot
+@dataclass(frozen=True)
+class StateSnapshot:
+    version: int
+    timestamp: float  # time.monotonic() when the joints were read
+    joint_positions_deg: Mapping[str, float]
+    joint_positions_norm: Mapping[str, float]
+    cartesian_mm: Mapping[str, float]
+    human_readable_state: Mapping[str, float]
+
+    @classmethod
+    def build(cls, version: int, timestamp: float, joint_positions_deg: Dict[str, float], joint_positions_norm: Dict[str, float],
+              cartesian_mm: Dict[str, float], human_readable_state: Dict[str, float]) -> "StateSnapshot":
+        # copy into read-only views so nobody can mutate a published snapshot
+        return cls(version, timestamp,
+                   MappingProxyType(dict(joint_positions_deg)), MappingProxyType(dict(joint_positions_norm)),
+                   MappingProxyType(dict(cartesian_mm)), MappingProxyType(dict(human_readable_state)))
+
+    #seconds since the joints were read
+    def age(self) -> float:
+        return time.monotonic() - self.timestamp
+
+    #same layout as RobotController.get_full_state
+    def to_state_dict(self) -> Dict[str, Any]:
+        return {
+            "joint_positions_deg": {name: round(pos, 1) for name, pos in self.joint_positions_deg.items()},
+            "joint_positions_norm": {name: round(pos, 1) for name, pos in self.joint_positions_norm.items()},
+            "cartesian_mm": {name: round(pos, 1) for name, pos in self.cartesian_mm.items()},
+            "human_readable_state": {name: round(pos, 1) for name, pos in self.human_readable_state.items()},
+        }
+
+
+class StateObserver:
+
+    #sample_fn(version) reads the arm and returns a StateSnapshot carrying that version
+    def __init__(self, sample_fn: Callable[[int], StateSnapshot], rate_hz: float = 20.0) -> None:
+        self.sample_fn = sample_fn
+        self.period = 1.0 / rate_hz
+        self._latest: Optional[StateSnapshot] = None
+        self._version = 0
+        self._sample_lock = threading.Lock()
+        self._published = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="state-observer", daemon=True)
+        self._thread.start()
+        logger.info(f"State observer started at {1.0 / self.period:.1f} Hz")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    #latest published snapshot without touching the bus, None before the first poll
+    @property
+    def latest(self) -> Optional[StateSnapshot]:
+        return self._latest
+
+    #read the arm now and publish the result, used when the cached snapshot is too old
+    def refresh(self) -> StateSnapshot:
+        with self._sample_lock:
+            snapshot = self.sample_fn(self._version + 1)
+            self._version = snapshot.version
+        with self._published:
+            self._latest = snapshot
+            self._published.notify_all()
+        return snapshot
+
+    #latest snapshot no older than max_staleness_s (any age when None), reads the arm synchronously otherwise
+    def get(self, max_staleness_s: Optional[float] = None) -> StateSnapshot:
+        snapshot = self._latest
+        if snapshot is None or (max_staleness_s is not None and snapshot.age() > max_staleness_s):
+            return self.refresh()
+        return snapshot
+
+    #block until a snapshot newer than version is published, returns None on timeout
+    def wait_for_newer(self, version: int, timeout: Optional[float] = None) -> Optional[StateSnapshot]:
+        with self._published:
+            self._published.wait_for(lambda: self._latest is not None and self._latest.version > version, timeout)
+            snapshot = self._latest
+        return snapshot if snapshot is not None and snapshot.version > version else None
+
+    def _loop(self) -> None:
+        next_poll = time.monotonic()
+        failing = False
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+                if failing:
+                    logger.info("State observer recovered")
+                failing = False
+            except Exception as e:
+                # log once per failure streak, the poll rate would flood the log otherwise
+                if not failing:
+                    logger.error(f"State observer failed to read robot state: {e}", exc_info=True)
+                failing = True
+
+            next_poll += self.period
+            delay = next_poll - time.monotonic()
+            if delay < 0:
+                # fell behind (slow bus read), restart the schedule instead of bursting
+                next_poll = time.monotonic()
+                delay = 0.0
+            self._stop.wait(delay)
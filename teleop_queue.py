@@ -0,0 +1,98 @@
+"""
+Teleop command queue that merges pending key presses into one accumulated target for a control thread
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+
+#everything the control thread should do next, in this order: preset, then the merged deltas, then the snapshot
+@dataclass
+class TeleopBatch:
+    preset: Optional[str] = None
+    move_deltas: Dict[str, float] = field(default_factory=dict)  # execute_interpolated keyword -> summed delta
+    gripper_delta: float = 0.0
+    snapshot: bool = False
+    commands: int = 0  # key presses merged into this batch
+    first_enqueued: float = 0.0  # time.monotonic() of the oldest merged press
+
+    @property
+    def empty(self) -> bool:
+        return self.commands == 0
+
+
+class TeleopCommandQueue:
+
+    #max_pending caps each accumulated delta, so a held key can never queue more than that much motion
+    def __init__(self, max_pending: Optional[Dict[str, float]] = None) -> None:
+        self.max_pending = max_pending or {}
+        self._pending = TeleopBatch()
+        self._ready = threading.Condition()
+        self._closed = False
+        self.dropped = 0  # presses superseded by a later preset
+
+    #add a cartesian / rotation delta, repeated presses of the same kind are summed
+    def push_move(self, deltas: Dict[str, float]) -> None:
+        with self._ready:
+            for name, delta in deltas.items():
+                total = self._pending.move_deltas.get(name, 0.0) + delta
+                self._pending.move_deltas[name] = self._clamp(name, total)
+            self._mark()
+
+    def push_gripper(self, delta: float) -> None:
+        with self._ready:
+            self._pending.gripper_delta = self._clamp("gripper", self._pending.gripper_delta + delta)
+            self._mark()
+
+    #a preset replaces every motion still waiting, there is no point moving somewhere the arm will leave right away
+    def push_preset(self, preset_key: str) -> None:
+        with self._ready:
+            superseded = self._pending.commands - (1 if self._pending.snapshot else 0)
+            self.dropped += max(0, superseded)
+            snapshot = self._pending.snapshot
+            self._pending = TeleopBatch(preset=preset_key, snapshot=snapshot,
+                                        commands=1 if snapshot else 0, first_enqueued=self._pending.first_enqueued)
+            self._mark()
+
+    def push_snapshot(self) -> None:
+        with self._ready:
+            self._pending.snapshot = True
+            self._mark()
+
+    #wait for pending commands and take all of them at once, None on timeout or after close
+    def take(self, timeout: Optional[float] = None) -> Optional[TeleopBatch]:
+        with self._ready:
+            self._ready.wait_for(lambda: self._closed or not self._pending.empty, timeout)
+            if self._pending.empty:
+                return None
+            batch, self._pending = self._pending, TeleopBatch()
+            return batch
+
+    #drop everything still waiting, e.g. when the operator hits stop
+    def clear(self) -> None:
+        with self._ready:
+            self.dropped += self._pending.commands
+            self._pending = TeleopBatch()
+
+    def close(self) -> None:
+        with self._ready:
+            self._closed = True
+            self._ready.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def _clamp(self, name: str, value: float) -> float:
+        limit = self.max_pending.get(name)
+        if limit is None:
+            return value
+        return max(-limit, min(limit, value))
+
+    def _mark(self) -> None:
+        if self._pending.commands == 0:
+            self._pending.first_enqueued = time.monotonic()
+        self._pending.commands += 1
+        self._ready.notify_all()
@@ -0,0 +1,152 @@
+"""
+Lightweight tracing spans, exported per session as Chrome / Perfetto trace JSON (chrome://tracing, ui.perfetto.dev)
+Disabled tracing costs one flag check per span
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_enabled = False
+_events: List[Dict[str, Any]] = []
+_events_lock = threading.Lock()
+_session: Optional[str] = None
+_session_start_ns = 0
+_max_events = 200000
+_dropped = 0
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+#start a new session, spans are collected until disable()
+def enable(max_events: int = 200000) -> str:
+    global _enabled, _session, _session_start_ns, _max_events, _dropped
+    with _events_lock:
+        if _enabled:
+            return _session
+        _events.clear()
+        _dropped = 0
+        _max_events = max_events
+        _session = time.strftime("%Y%m%d_%H%M%S")
+        _session_start_ns = time.perf_counter_ns()
+        _enabled = True
+    logger.info(f"Tracing enabled, session {_session}")
+    return _session
+
+
+#stop collecting and write the session to trace_dir, returns the file path (None when nothing was recorded)
+def disable(trace_dir: Optional[str] = None) -> Optional[str]:
+    global _enabled
+    with _events_lock:
+        if not _enabled:
+            return None
+        _enabled = False
+    return export(trace_dir) if trace_dir else None
+
+
+def _record(name: str, start_ns: int, end_ns: int, args: Optional[Dict[str, Any]]) -> None:
+    global _dropped
+    event = {
+        "name": name,
+        "ph": "X",
+        "ts": (start_ns - _session_start_ns) / 1000.0,  # microseconds since the session started
+        "dur": (end_ns - start_ns) / 1000.0,
+        "pid": os.getpid(),
+        "tid": threading.get_ident(),
+    }
+    if args:
+        event["args"] = args
+    with _events_lock:
+        if len(_events) >= _max_events:
+            _dropped += 1
+            return
+        _events.append(event)
+
+
+#time a block: with span("camera_capture", cameras=2): ...
+@contextmanager
+def _span(name: str, args: Dict[str, Any]) -> Iterator[None]:
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        _record(name, start, time.perf_counter_ns(), args)
+
+
+class _NoSpan:
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: Any) -> bool:
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name: str, **args: Any) -> Any:
+    if not _enabled:
+        return _NO_SPAN
+    return _span(name, args)
+
+
+#decorator timing every call of a function or coroutine function as one span
+def traced(name: Optional[str] = None) -> Callable[[Callable], Callable]:
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not _enabled:
+                    return await func(*args, **kwargs)
+                start = time.perf_counter_ns()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    _record(span_name, start, time.perf_counter_ns(), None)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record(span_name, start, time.perf_counter_ns(), None)
+        return wrapper
+    return decorator
+
+
+#write the spans recorded in the current (or last) session as trace_<session>.json in trace_dir
+def export(trace_dir: str) -> Optional[str]:
+    with _events_lock:
+        if _session is None:
+            return None
+        events = list(_events)
+        dropped = _dropped
+
+    # name the tracks so the motion, observer and camera threads are easy to tell apart
+    thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+    metadata = [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": thread_names.get(tid, str(tid))}}
+                for tid in sorted({event["tid"] for event in events})]
+
+    os.makedirs(trace_dir, exist_ok=True)
+    path = os.path.join(trace_dir, f"trace_{_session}.json")
+    with open(path, "w") as f:
+        json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms",
+                   "otherData": {"session": _session, "dropped_events": dropped}}, f)
+    logger.info(f"Wrote {len(events)} trace events to {path}")
+    return path